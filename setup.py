@@ -36,6 +36,9 @@ setup(name='sqlalchemy-foundationdb',
          'sqlalchemy.dialects': [
               'foundationdb = sqlalchemy_foundationdb.dialect.psycopg2:FDBPsycopg2Dialect',
               'foundationdb.psycopg2 = sqlalchemy_foundationdb.dialect.psycopg2:FDBPsycopg2Dialect',
+              # used by sqlalchemy_foundationdb.asyncio, which
+              # requires Python 3.5.2 or later
+              'foundationdb.psycopg2async = sqlalchemy_foundationdb.dialect.psycopg2async:FDBPsycopg2AsyncDialect',
               ]
         }
 )
@@ -4,5 +4,7 @@ from sqlalchemy.dialects import registry
 
 registry.register("foundationdb", "sqlalchemy_foundationdb.dialect.psycopg2", "FDBPsycopg2Dialect")
 registry.register("foundationdb+psycopg2", "sqlalchemy_foundationdb.dialect.psycopg2", "FDBPsycopg2Dialect")
+registry.register("foundationdb+psycopg2async", "sqlalchemy_foundationdb.dialect.psycopg2async", "FDBPsycopg2AsyncDialect")
 
-from .dialect import nested
+from .dialect import nested, batch_insert, fetch_hierarchy
+from .retry import retry, RetryMetrics
@@ -0,0 +1,571 @@
+"""Run statements and ORM queries against the FoundationDB SQL Layer
+from asyncio coroutines.
+
+Statements are compiled, and their results processed, by the
+``foundationdb+psycopg2async`` dialect, and are sent on psycopg2
+connections in asynchronous mode, the event loop waiting on the
+connection's socket for the results rather than blocking a thread.
+
+"""
+import asyncio
+import collections
+
+from psycopg2 import extensions
+from sqlalchemy import exc, pool, util
+from sqlalchemy.engine import Engine, Connection
+from sqlalchemy.engine import url as sa_url
+from sqlalchemy.engine.util import _distill_params
+from sqlalchemy.schema import DDLElement
+from sqlalchemy.sql import expression, util as sql_util
+
+from . import compat
+from .dialect.psycopg2async import FDBPsycopg2AsyncDialect, \
+            _no_sync_execution
+
+
+def create_engine(url, pool_size=10, **kwargs):
+    """Create an :class:`.AsyncEngine` for a
+    ``foundationdb+psycopg2async://`` URL::
+
+        from sqlalchemy_foundationdb.asyncio import create_engine
+
+        engine = create_engine("foundationdb+psycopg2async://@localhost:15432/")
+
+        async def get_customer(id_):
+            async with engine.connect() as conn:
+                result = await conn.execute(
+                            customer.select().where(customer.c.id == id_))
+                return result.first()
+
+    No connection is made until the first :meth:`.AsyncEngine.connect`.
+
+    :param url: the database URL, as for
+     :func:`~sqlalchemy:sqlalchemy.create_engine`.
+
+    :param pool_size: the most connections to have open at once;
+     :meth:`.AsyncEngine.connect` waits for a connection to be
+     returned to the pool when all of them are in use.
+
+    :param \\**kwargs: arguments accepted by the dialect, such as
+     ``isolation_level`` and ``insert_batch_size``, as well as ``echo``.
+
+    .. seealso::
+
+        :ref:`core_asyncio`
+
+    """
+    u = sa_url.make_url(url)
+    dialect_cls = u.get_dialect()
+    if not issubclass(dialect_cls, FDBPsycopg2AsyncDialect):
+        raise exc.ArgumentError(
+            "sqlalchemy_foundationdb.asyncio requires the "
+            "foundationdb+psycopg2async dialect; got '%s'" % u.drivername)
+
+    dialect_args = dict(
+        (k, kwargs.pop(k)) for k in util.get_cls_kwargs(dialect_cls)
+        if k in kwargs
+    )
+    echo = kwargs.pop('echo', None)
+    if kwargs:
+        raise TypeError(
+            "Invalid argument(s) %s sent to create_engine(), "
+            "using configuration %s." % (
+                ",".join("'%s'" % k for k in kwargs), dialect_cls.__name__))
+
+    dialect_args['dbapi'] = dialect_cls.dbapi()
+    return AsyncEngine(dialect_cls(**dialect_args), u, pool_size, echo=echo)
+
+
+def _ready(future):
+    if not future.done():
+        future.set_result(None)
+
+async def _poll(conn):
+    """Wait for the current operation of an asynchronous DBAPI
+    connection to complete."""
+
+    loop = asyncio.get_event_loop()
+    while True:
+        state = conn.poll()
+        if state == extensions.POLL_OK:
+            return
+        elif state == extensions.POLL_READ:
+            add, remove = loop.add_reader, loop.remove_reader
+        elif state == extensions.POLL_WRITE:
+            add, remove = loop.add_writer, loop.remove_writer
+        else:
+            raise conn.OperationalError("poll() returned %s" % state)
+
+        fd = conn.fileno()
+        future = loop.create_future()
+        add(fd, _ready, future)
+        try:
+            await future
+        finally:
+            remove(fd)
+
+async def _execute(conn, statement):
+    """Run a statement without parameters on an asynchronous DBAPI
+    connection, returning its rows, if any."""
+
+    cursor = conn.cursor()
+    try:
+        cursor.execute(statement)
+        await _poll(conn)
+        if cursor.description is not None:
+            return cursor.fetchall()
+        return None
+    finally:
+        cursor.close()
+
+
+class _AsyncContext(object):
+    """An awaitable producing a connection or transaction, which may
+    also be used with ``async with``."""
+
+    def __init__(self, coro):
+        self._coro = coro
+        self._obj = None
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self):
+        self._obj = await self._coro
+        return await self._obj.__aenter__()
+
+    async def __aexit__(self, type_, value, traceback):
+        return await self._obj.__aexit__(type_, value, traceback)
+
+
+class _ConnectionFairy(object):
+    """Stands in for the pool's proxy of a DBAPI connection, for the
+    :class:`~sqlalchemy:sqlalchemy.engine.Connection` against which
+    executions are set up.
+
+    """
+    _connection_record = None
+    _reset_agent = None
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.info = {}
+
+    @property
+    def is_valid(self):
+        return not self.connection.closed
+
+    def cursor(self, *args, **kwargs):
+        return self.connection.cursor(*args, **kwargs)
+
+    def invalidate(self, e=None, soft=False):
+        self.connection.close()
+
+    def close(self):
+        # the connection is returned to the pool by AsyncConnection.close()
+        pass
+
+    def __getattr__(self, key):
+        return getattr(self.connection, key)
+
+
+class _Pool(object):
+    """A pool of at most ``size`` asynchronous DBAPI connections."""
+
+    def __init__(self, engine, size):
+        self.engine = engine
+        self.size = size
+        self._idle = collections.deque()
+        self._semaphore = None
+
+    async def acquire(self):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.size)
+
+        await self._semaphore.acquire()
+        try:
+            while self._idle:
+                conn = self._idle.pop()
+                if not conn.closed:
+                    return conn
+            return await self.engine._connect()
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    async def release(self, conn):
+        try:
+            if not conn.closed and conn.get_transaction_status() != \
+                    extensions.TRANSACTION_STATUS_IDLE:
+                try:
+                    await _execute(conn, "ROLLBACK")
+                except self.engine.dialect.dbapi.Error:
+                    conn.close()
+                except BaseException:
+                    conn.close()
+                    raise
+            if not conn.closed:
+                self._idle.append(conn)
+        finally:
+            self._semaphore.release()
+
+    def dispose(self):
+        while self._idle:
+            self._idle.pop().close()
+
+
+class AsyncEngine(object):
+    """A pool of asynchronous connections to the FoundationDB SQL Layer,
+    produced by :func:`.create_engine`.
+
+    """
+
+    def __init__(self, dialect, url, pool_size, echo=None):
+        self.dialect = dialect
+        self.url = url
+
+        # executions are set up against a regular Engine and Connection,
+        # which are never used to run statements themselves
+        self._engine = Engine(
+                pool.NullPool(self._no_sync_connect), dialect, url, echo=echo)
+
+        self._connect_args = dialect.create_connect_args(url)
+        self._on_connect = dialect.on_connect()
+        self._pool = _Pool(self, pool_size)
+        self._initialized = False
+
+    def _no_sync_connect(self):
+        raise _no_sync_execution()
+
+    def connect(self):
+        """Return an :class:`.AsyncConnection` from the pool.
+
+        The return value may be awaited, or used with ``async with``,
+        in which case the connection is returned to the pool at the
+        end of the block::
+
+            async with engine.connect() as conn:
+                ...
+
+        """
+        return _AsyncContext(self._checkout())
+
+    async def _checkout(self):
+        return AsyncConnection(self, await self._pool.acquire())
+
+    def dispose(self):
+        """Close the connections in the pool which aren't in use."""
+
+        self._pool.dispose()
+
+    def _connection(self, dbapi_connection):
+        return Connection(self._engine,
+                        connection=_ConnectionFairy(dbapi_connection))
+
+    async def _connect(self):
+        dialect = self.dialect
+        cargs, cparams = self._connect_args
+        conn = None
+        try:
+            conn = dialect.connect(*cargs, **cparams)
+            await _poll(conn)
+
+            if self._on_connect is not None:
+                self._on_connect(conn)
+            if not self._initialized:
+                await self._initialize(conn)
+                self._initialized = True
+            if dialect.isolation_level is not None:
+                await _execute(conn,
+                    "SET SESSION CHARACTERISTICS AS TRANSACTION %s" %
+                    dialect._isolation_level_characteristics(
+                                                dialect.isolation_level))
+        except dialect.dbapi.Error as e:
+            if conn is not None:
+                conn.close()
+            util.raise_from_cause(
+                exc.DBAPIError.instance(None, None, e, dialect.dbapi.Error))
+        except BaseException:
+            if conn is not None:
+                conn.close()
+            raise
+        return conn
+
+    async def _initialize(self, conn):
+        # the parts of dialect.initialize() which apply here, with
+        # each statement waited on.
+        dialect = self.dialect
+        rows = await _execute(conn, "select server_version from "
+                        "information_schema.server_instance_summary")
+        dialect.server_version_info = dialect._parse_server_version(
+                                                            rows[0][0])
+        rows = await _execute(conn, "select CURRENT_SCHEMA")
+        dialect.default_schema_name = rows[0][0]
+        dialect.returns_unicode_strings = dialect.use_native_unicode
+
+        dialect._set_server_capabilities(dialect.server_version_info)
+        dialect.supports_nested_cursors = \
+            dialect._get_nested_cursor_support(self._connection(conn))
+
+
+class AsyncConnection(object):
+    """A connection checked out from an :class:`.AsyncEngine`.
+
+    The connection is in autocommit mode, each statement being a
+    transaction of its own, until :meth:`.begin` is called.
+
+    """
+
+    def __init__(self, engine, dbapi_connection):
+        self.engine = engine
+        self.dialect = engine.dialect
+        self._dbapi_connection = dbapi_connection
+        self._connection = engine._connection(dbapi_connection)
+        self._transaction = None
+
+    @property
+    def closed(self):
+        return self._dbapi_connection is None
+
+    def in_transaction(self):
+        """Return True if a transaction is in progress."""
+
+        return self._transaction is not None
+
+    def begin(self):
+        """Begin a transaction, returning an :class:`.AsyncTransaction`.
+
+        The return value may be awaited, or used with ``async with``, in
+        which case the transaction is committed at the end of the block,
+        or rolled back if it raises::
+
+            async with conn.begin():
+                await conn.execute(customer.insert(), name='c1')
+
+        """
+        return _AsyncContext(self._begin())
+
+    async def _begin(self):
+        if self._transaction is not None:
+            raise exc.InvalidRequestError(
+                "A transaction is already begun on this connection")
+        await self._execute_text("BEGIN")
+        self._transaction = AsyncTransaction(self)
+        return self._transaction
+
+    async def execute(self, object_, *multiparams, **params):
+        """Execute a statement, returning a
+        :class:`~sqlalchemy:sqlalchemy.engine.ResultProxy`.
+
+        The arguments are as for
+        :meth:`sqlalchemy:sqlalchemy.engine.Connection.execute`, except
+        that only a single set of parameters may be given.  The result
+        is fetched in full before it is returned, so that reading it,
+        including any nested results, doesn't wait on the database.
+
+        """
+        if isinstance(object_, util.string_types):
+            object_ = expression.text(object_)
+
+        distilled_params = _distill_params(multiparams, params)
+        if len(distilled_params) > 1:
+            raise exc.InvalidRequestError(
+                "Asynchronous connections can't execute a statement with "
+                "multiple parameter sets; use a multiple-row INSERT, such "
+                "as that of batch_insert(), instead")
+
+        dialect = self.dialect
+        connection = self._connection
+        if isinstance(object_, DDLElement):
+            compiled = object_.compile(dialect=dialect)
+            context = dialect.execution_ctx_cls._init_ddl(
+                            dialect, connection, connection.connection,
+                            compiled)
+        else:
+            if distilled_params:
+                keys = list(distilled_params[0])
+            else:
+                keys = []
+            compiled = object_.compile(dialect=dialect, column_keys=keys)
+            context = dialect.execution_ctx_cls._init_compiled(
+                            dialect, connection, connection.connection,
+                            compiled, distilled_params)
+
+        await self._cursor_execute(context.cursor, context.statement,
+                                   context.parameters[0], context)
+        return self._result(context)
+
+    async def scalar(self, object_, *multiparams, **params):
+        """Execute a statement, returning the first column of its first
+        row."""
+
+        result = await self.execute(object_, *multiparams, **params)
+        return result.scalar()
+
+    async def query(self, query):
+        """Run an ORM :class:`~sqlalchemy:sqlalchemy.orm.query.Query` on
+        this connection, returning the list of its results.
+
+        The query's :class:`~sqlalchemy:sqlalchemy.orm.session.Session`
+        is used only for its identity map; it isn't flushed beforehand,
+        and lazy loads of the objects returned would run synchronously,
+        so relationships should be loaded up front using
+        :func:`.nestedload`::
+
+            customers = await conn.query(
+                    session.query(Customer).
+                    options(nestedload(Customer.orders)))
+
+        """
+        context = query._compile_context()
+        context.statement.use_labels = True
+        statement = context.statement
+        if query._execution_options:
+            statement = statement.execution_options(
+                                    **query._execution_options)
+
+        result = await self.execute(statement, query._params)
+        return list(query.instances(result, context))
+
+    async def close(self):
+        """Return the connection to the pool, rolling back the
+        transaction in progress, if any."""
+
+        if self._dbapi_connection is None:
+            return
+        dbapi_connection, self._dbapi_connection = \
+                                    self._dbapi_connection, None
+        self._transaction = None
+        await self.engine._pool.release(dbapi_connection)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type_, value, traceback):
+        await self.close()
+
+    async def _execute_text(self, statement):
+        cursor = self._dbapi_connection.cursor()
+        try:
+            await self._cursor_execute(cursor, statement, None)
+        finally:
+            cursor.close()
+
+    async def _cursor_execute(self, cursor, statement, parameters,
+                                                        context=None):
+        if self._dbapi_connection is None:
+            raise exc.ResourceClosedError("This connection is closed")
+
+        if self._connection._echo:
+            logger = self.engine._engine.logger
+            logger.info(statement)
+            logger.info("%r", sql_util._repr_params(parameters, batches=10))
+        try:
+            cursor.execute(statement, parameters)
+            await _poll(self._dbapi_connection)
+        except self.dialect.dbapi.Error as e:
+            self._handle_dbapi_exception(e, statement, parameters, context)
+        except BaseException:
+            # cancelled while the statement is in progress; the
+            # connection can't be used until it completes
+            self._dbapi_connection.close()
+            raise
+
+    def _handle_dbapi_exception(self, e, statement, parameters, context):
+        is_disconnect = self.dialect.is_disconnect(
+                                e, self._dbapi_connection, None)
+        if context is not None:
+            context.handle_dbapi_exception(e)
+        if is_disconnect:
+            self._dbapi_connection.close()
+        util.raise_from_cause(
+            exc.DBAPIError.instance(
+                statement, parameters, e, self.dialect.dbapi.Error,
+                connection_invalidated=is_disconnect))
+
+    def _result(self, context):
+        # the steps of Connection._execute_context() which follow
+        # the execution of the statement
+        if context.compiled:
+            context.post_exec()
+
+        if compat.sqla_10:
+            if context.is_crud or context.is_text:
+                result = context._setup_crud_result_proxy()
+            else:
+                result = context.get_result_proxy()
+                if result._metadata is None:
+                    result._soft_close(_autoclose_connection=False)
+        else:
+            if context.compiled and context.isinsert and \
+                    not context.executemany:
+                context.post_insert()
+
+            result = context.get_result_proxy()
+            if context.isinsert:
+                if context._is_implicit_returning:
+                    context._fetch_implicit_returning(result)
+                    result.close(_autoclose_connection=False)
+                    result._metadata = None
+                elif not context._is_explicit_returning:
+                    result.close(_autoclose_connection=False)
+                    result._metadata = None
+            elif context.isupdate and context._is_implicit_returning:
+                context._fetch_implicit_update_returning(result)
+                result.close(_autoclose_connection=False)
+                result._metadata = None
+            elif result._metadata is None:
+                result.rowcount
+                result.close(_autoclose_connection=False)
+        return result
+
+
+class AsyncTransaction(object):
+    """A transaction begun by :meth:`.AsyncConnection.begin`."""
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.is_active = True
+
+    async def commit(self):
+        """Commit the transaction.
+
+        A COMMIT which fails, such as on a FoundationDB conflict, ends
+        the transaction as well.
+
+        """
+        if not self.is_active:
+            raise exc.InvalidRequestError("This transaction is inactive")
+        try:
+            await self.connection._execute_text("COMMIT")
+        finally:
+            self._deactivate()
+
+    async def rollback(self):
+        """Roll back the transaction."""
+
+        if not self.is_active:
+            return
+        if self.connection.closed or \
+                self.connection._dbapi_connection.closed:
+            # the connection was lost or closed mid-statement,
+            # taking the transaction with it
+            self._deactivate()
+            return
+        try:
+            await self.connection._execute_text("ROLLBACK")
+        finally:
+            self._deactivate()
+
+    def _deactivate(self):
+        self.is_active = False
+        self.connection._transaction = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type_, value, traceback):
+        if type_ is None and self.is_active:
+            await self.commit()
+        else:
+            await self.rollback()
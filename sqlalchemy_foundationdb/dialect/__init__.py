@@ -1 +1 @@
-from .base import nested
\ No newline at end of file
+from .base import nested, batch_insert, fetch_hierarchy
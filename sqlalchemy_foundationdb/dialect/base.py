@@ -1,13 +1,18 @@
 
 import re
 
-from sqlalchemy import sql, exc, util
+from sqlalchemy import sql, exc, util, event
 from sqlalchemy.engine import default, reflection, ResultProxy
+from sqlalchemy.engine.result import ResultMetaData
 from sqlalchemy.sql import compiler, expression, text
 from sqlalchemy import types as sqltypes, schema as sa_schema
 from foundationdb_sql.api import NESTED_CURSOR
 from sqlalchemy.ext.compiler import compiles
 import collections
+import hashlib
+import os
+import threading
+import time
 from .. import compat
 
 from sqlalchemy.types import INTEGER, BIGINT, SMALLINT, VARCHAR, \
@@ -81,11 +86,74 @@ class NestedResult(sqltypes.TypeEngine):
         :class:`.nested`
 
     """
-    def foundationdb_result_processor(self, gen_nested_context):
-        def process(value):
-            return ResultProxy(gen_nested_context(value))
+    def foundationdb_result_processor(self, nested_context):
+        batch_size = _stream_batch_size(nested_context.execution_options)
+        if batch_size:
+            def process(value):
+                return _stream_nested_rows(
+                            NestedResultProxy(nested_context, value),
+                            batch_size)
+        else:
+            def process(value):
+                return NestedResultProxy(nested_context, value)
+        # allows fetch_hierarchy() to read nested cursors directly
+        process._foundationdb_nested_context = nested_context
         return process
 
+class NestedResultProxy(ResultProxy):
+    """A :class:`~sqlalchemy:sqlalchemy.engine.ResultProxy` delivering the
+    rows of a nested cursor.
+
+    The result metadata for the nested cursor is built once and shared
+    by all the nested results of the same column, rather than
+    being rebuilt for each parent row.
+
+    """
+    def __init__(self, context, cursor):
+        self.context = context
+        self.dialect = context.dialect
+        self.closed = False
+        self.cursor = self._saved_cursor = cursor
+        self.connection = context.root_connection
+        self._echo = context._echo
+        self._init_metadata()
+
+    def _init_metadata(self):
+        self._metadata = self.context._result_metadata(self)
+
+DEFAULT_STREAM_BATCH_SIZE = 100
+
+def _stream_batch_size(execution_options):
+    """Return the batch size for the ``foundationdb_stream_nested``
+    execution option, or None if streaming is not enabled."""
+
+    stream = execution_options.get('foundationdb_stream_nested', False)
+    if stream is True:
+        return DEFAULT_STREAM_BATCH_SIZE
+    elif stream:
+        return int(stream)
+    else:
+        return None
+
+def _stream_nested_rows(result, batch_size):
+    """Yield rows from a nested :class:`~sqlalchemy:sqlalchemy.engine.ResultProxy`
+    ``batch_size`` rows at a time.
+
+    The result is closed once exhausted, or when the generator is closed
+    or garbage collected without being exhausted, so that the nested
+    cursor is released as soon as the parent row is done with it.
+
+    """
+    try:
+        while True:
+            rows = result.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row
+    finally:
+        result.close()
+
 class nested(expression.ScalarSelect):
     """Provide a 'nested' subquery.
 
@@ -121,6 +189,172 @@ class nested(expression.ScalarSelect):
         self.type = NestedResult()
 
 
+def fetch_hierarchy(result, named_tuples=False):
+    """Fetch all rows of a result, including the rows of its
+    :class:`.nested` columns, as plain dictionaries.
+
+    Each row becomes a dictionary keyed on column name, with each nested
+    column value in turn a list of dictionaries, so that a whole
+    hierarchy is fetched in a single pass::
+
+        from sqlalchemy_foundationdb import nested, fetch_hierarchy
+
+        items = nested(select([item.c.id, item.c.price]).
+                        where(item.c.order_id == order.c.id)).label('items')
+        orders = nested(select([order.c.id, items]).
+                        where(order.c.customer_id == customer.c.id)).\
+                        label('orders')
+
+        fetch_hierarchy(conn.execute(select([customer.c.id, orders])))
+
+        # [{"id": 1, "orders": [{"id": 101, "items": [...]}, ...]}, ...]
+
+    The keys and result processors of each column are looked up once
+    per nested column, rather than once per nested result, and no
+    :class:`~sqlalchemy:sqlalchemy.engine.ResultProxy` is created for
+    each nested result; this is useful where the rows are serialized
+    directly, such as by a JSON API.  The result is closed once
+    fetched.
+
+    :param result: a :class:`~sqlalchemy:sqlalchemy.engine.ResultProxy`.
+
+    :param named_tuples: if True, rows are returned as named tuples
+     rather than dictionaries; column names which aren't valid
+     attribute names are renamed positionally, as by
+     :func:`collections.namedtuple`.
+
+    .. seealso::
+
+        :ref:`core_fetch_hierarchy`
+
+    """
+    if result._metadata is None:
+        raise exc.ResourceClosedError(
+                "This result object does not return rows.")
+    builder = _RowBuilder(result._metadata, named_tuples)
+    try:
+        return [builder(row) for row in result._fetchall_impl()]
+    finally:
+        result.close()
+
+class _RowBuilder(object):
+    """Turns the raw rows of a cursor, given its result metadata, into
+    dictionaries or named tuples for :func:`.fetch_hierarchy`."""
+
+    def __init__(self, metadata, named_tuples):
+        keys = list(metadata.keys)
+        self.named_tuples = named_tuples
+        self.processors = []
+        self.nested = []
+        for index, processor in enumerate(metadata._processors):
+            nested_context = getattr(
+                        processor, '_foundationdb_nested_context', None)
+            if nested_context is not None:
+                self.nested.append((index, nested_context))
+            elif processor is not None:
+                self.processors.append((index, processor))
+        self._nested_builders = {}
+
+        if named_tuples:
+            self.make = collections.namedtuple(
+                                    'Row', keys, rename=True)._make
+        else:
+            self.make = lambda values: dict(zip(keys, values))
+
+    def __call__(self, row):
+        values = list(row)
+        for index, processor in self.processors:
+            values[index] = processor(values[index])
+        for index, nested_context in self.nested:
+            values[index] = self._fetch_nested(
+                                index, nested_context, values[index])
+        return self.make(values)
+
+    def _fetch_nested(self, index, nested_context, cursor):
+        if cursor is None:
+            return []
+        try:
+            builder = self._nested_builders[index]
+        except KeyError:
+            # the metadata of a nested column is the same for each
+            # parent row; build it from the first nested cursor only
+            metadata = NestedResultProxy(nested_context, cursor)._metadata
+            if metadata is None:
+                return []
+            builder = self._nested_builders[index] = \
+                            _RowBuilder(metadata, self.named_tuples)
+        try:
+            return [builder(row) for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+
+def batch_insert(connection, table, parameters, chunk_size=None):
+    """INSERT a list of parameter dictionaries into a table using multi-row
+    ``INSERT .. VALUES (..), (..) RETURNING`` statements.
+
+    Unlike passing a list of parameters to
+    :meth:`sqlalchemy:sqlalchemy.engine.Connection.execute`, the primary key
+    values generated for each row are returned::
+
+        from sqlalchemy_foundationdb import batch_insert
+
+        params = [{"name": "c1"}, {"name": "c2"}, {"name": "c3"}]
+        pks = batch_insert(conn, customer, params)
+
+    :param connection: a :class:`~sqlalchemy:sqlalchemy.engine.Connection`.
+
+    :param table: the :class:`~sqlalchemy:sqlalchemy.schema.Table` to
+     INSERT into, which must have a primary key.
+
+    :param parameters: a list of dictionaries, keyed on column key.  Each
+     dictionary is updated in place with the primary key values of its row.
+
+    :param chunk_size: the most rows to send in a single statement; defaults
+     to the ``insert_batch_size`` argument of
+     :func:`~sqlalchemy:sqlalchemy.create_engine`.
+
+    :return: a list of primary key tuples, in the order of ``parameters``.
+
+    .. seealso::
+
+        :ref:`core_batch_insert`
+
+    """
+    pk_cols = list(table.primary_key)
+    if not pk_cols:
+        raise exc.ArgumentError(
+                "batch_insert() requires a table with a primary key; "
+                "table '%s' has none" % table.name)
+
+    if chunk_size is None:
+        chunk_size = connection.dialect.insert_batch_size
+
+    pks = []
+    for chunk in _insert_chunks(parameters, chunk_size):
+        result = connection.execute(
+                        table.insert().values(chunk).returning(*pk_cols))
+        for params, row in zip(chunk, result.fetchall()):
+            for col, value in zip(pk_cols, row):
+                params[col.key] = value
+            pks.append(tuple(row))
+    return pks
+
+def _insert_chunks(parameters, chunk_size):
+    """Split parameters into runs with the same keys, of at most
+    ``chunk_size`` each, keeping their order."""
+
+    chunk = []
+    chunk_keys = None
+    for params in parameters:
+        keys = set(params)
+        if chunk and (keys != chunk_keys or len(chunk) >= chunk_size):
+            yield chunk
+            chunk = []
+        chunk_keys = keys
+        chunk.append(params)
+    if chunk:
+        yield chunk
 
 colspecs = {
 }
@@ -143,9 +377,17 @@ ischema_names = {
 }
 
 
+def _check_nested_cursors(compiler):
+    if not getattr(compiler.dialect, 'supports_nested_cursors', True):
+        raise exc.CompileError(
+            "Nested result columns require a DBAPI connection with "
+            "nested cursor support; the FoundationDB dialect uses "
+            "foundationdb_sql.psycopg2.Connection for this.")
+
 if compat.sqla_10:
     @compiles(nested)
     def _visit_foundationdb_nested(nested, compiler, **kw):
+        _check_nested_cursors(compiler)
         with compiler._nested_result() as nested_result_structure:
             compiler._foundationdb_nested[nested.type] = \
                 nested_result_structure
@@ -153,6 +395,7 @@ if compat.sqla_10:
 else:
     @compiles(nested)
     def _visit_foundationdb_nested(nested, compiler, **kw):
+        _check_nested_cursors(compiler)
         saved_result_map = compiler.result_map
         if hasattr(compiler, '_foundationdb_nested'):
             compiler.result_map = \
@@ -170,13 +413,43 @@ class FDBCompiler(compiler.SQLCompiler):
     def _foundationdb_nested(self):
         return {}
 
+    @util.memoized_property
+    def _foundationdb_nested_plans(self):
+        return {}
+
+    def _foundationdb_nested_plan(self, type_):
+        try:
+            return self._foundationdb_nested_plans[type_]
+        except KeyError:
+            plan = self._foundationdb_nested_plans[type_] = \
+                _NestedPlan(self._foundationdb_nested[type_])
+            return plan
+
+    if compat.sqla_10:
+        def _limit_offset_clauses(self, select):
+            # the select's own bound parameters, which may also be
+            # bindparam() objects given to limit() / offset()
+            return select._limit_clause, select._offset_clause
+    else:
+        def _limit_offset_clauses(self, select):
+            return (
+                sql.literal(select._limit)
+                    if select._limit is not None else None,
+                sql.literal(select._offset)
+                    if select._offset is not None else None
+            )
+
     def limit_clause(self, select, **kwargs):
+        # LIMIT and OFFSET are rendered as bound parameters, unless
+        # literal_binds is in effect, so that the statement text doesn't
+        # vary with their values
+        limit, offset = self._limit_offset_clauses(select)
         text = ""
-        if select._limit is not None:
-            text += " \n LIMIT " + self.process(sql.literal(select._limit), **kwargs)
-        if select._offset is not None:
-            text += " OFFSET " + self.process(sql.literal(select._offset), **kwargs)
-            if select._limit is None:
+        if limit is not None:
+            text += " \n LIMIT " + self.process(limit, **kwargs)
+        if offset is not None:
+            text += " OFFSET " + self.process(offset, **kwargs)
+            if limit is None:
                 text += " ROWS"  # OFFSET n ROW[S]
         return text
 
@@ -280,39 +553,536 @@ class FDBIdentifierPreparer(compiler.IdentifierPreparer):
     illegal_initial_characters = set(range(0, 10)).union(["_", "$"])
 
 class FDBInspector(reflection.Inspector):
-    pass
+    """Inspector for FoundationDB SQL Layer schemas.
+
+    In addition to the standard
+    :class:`~sqlalchemy:sqlalchemy.engine.reflection.Inspector` methods,
+    provides ``get_multi_*()`` methods which load the information for
+    every table in a schema at once, as well as :meth:`.reflect_schema`.
+    Once a ``get_multi_*()`` method has been called for a schema, the
+    corresponding per-table methods of the same inspector are served
+    from its result, rather than querying the database again.
+
+    """
+
+    def get_multi_columns(self, schema=None):
+        """Return the columns of every table in a schema, as a dictionary
+        of table name to the :meth:`.get_columns` result."""
+        return self.dialect.get_multi_columns(
+                        self.bind, schema, info_cache=self.info_cache)
+
+    def get_multi_pk_constraint(self, schema=None):
+        """Return the primary key constraint of every table in a schema,
+        as a dictionary of table name to the :meth:`.get_pk_constraint`
+        result."""
+        return self.dialect.get_multi_pk_constraint(
+                        self.bind, schema, info_cache=self.info_cache)
+
+    def get_multi_unique_constraints(self, schema=None):
+        """Return the unique constraints of every table in a schema,
+        as a dictionary of table name to the
+        :meth:`.get_unique_constraints` result."""
+        return self.dialect.get_multi_unique_constraints(
+                        self.bind, schema, info_cache=self.info_cache)
+
+    def get_multi_foreign_keys(self, schema=None):
+        """Return the foreign keys, including grouping foreign keys, of
+        every table in a schema, as a dictionary of table name to the
+        :meth:`.get_foreign_keys` result."""
+        return self.dialect.get_multi_foreign_keys(
+                        self.bind, schema, info_cache=self.info_cache)
+
+    def get_multi_indexes(self, schema=None):
+        """Return the indexes of every table in a schema, as a dictionary
+        of table name to the :meth:`.get_indexes` result."""
+        return self.dialect.get_multi_indexes(
+                        self.bind, schema, info_cache=self.info_cache)
+
+    def get_multi_identity_sequences(self, schema=None):
+        """Return the names of the sequences behind the IDENTITY columns
+        of every table in a schema, as a dictionary of table name to
+        sequence name."""
+        return self.dialect.get_multi_identity_sequences(
+                        self.bind, schema, info_cache=self.info_cache)
+
+    def reflect_schema(self, metadata, schema=None, only=None, snapshot=None):
+        """Reflect all tables of a schema into the given
+        :class:`~sqlalchemy:sqlalchemy.schema.MetaData`.
+
+        This is the equivalent of
+        :meth:`~sqlalchemy:sqlalchemy.schema.MetaData.reflect`, which
+        queries the database separately for each table it reflects;
+        here the columns, constraints and indexes of the whole schema
+        are loaded up front with one query each.
+
+        :param metadata: the :class:`~sqlalchemy:sqlalchemy.schema.MetaData`
+         to which :class:`~sqlalchemy:sqlalchemy.schema.Table` objects are
+         added.  Tables already present are left as is.
+
+        :param schema: the schema to reflect; defaults to the default
+         schema.
+
+        :param only: optional list of table names to reflect.
+
+        :param snapshot: optional path of a snapshot file, as written by
+         :meth:`.save_snapshot`.  If the file is present and still
+         matches the database schema, the schema is reflected from it;
+         otherwise, the schema is reflected from the database and the
+         file is written anew.
+
+        Returns the list of newly reflected
+        :class:`~sqlalchemy:sqlalchemy.schema.Table` objects.
+
+        .. seealso::
+
+            :ref:`core_bulk_reflection`
+
+        """
+        fingerprint = None
+        if snapshot is not None and not self.load_snapshot(snapshot, schema):
+            # fingerprint the schema ahead of loading it, so that a
+            # change made in between invalidates the snapshot
+            fingerprint = self.dialect._schema_fingerprint(self.bind, schema)
+
+        table_names = self._load_multi(schema)
+        if only is not None:
+            missing = set(only).difference(table_names)
+            if missing:
+                raise exc.InvalidRequestError(
+                    "Could not reflect: requested table(s) not available "
+                    "in %s%s: (%s)" % (
+                        self.bind.engine.url,
+                        (schema and " schema '%s'" % schema or ''),
+                        ', '.join(sorted(missing))))
+            table_names = [name for name in table_names if name in only]
+
+        # create all the Table objects first, so that tables referred
+        # to by foreign keys are found in the MetaData rather than
+        # being reflected individually.
+        tables = [
+            sa_schema.Table(name, metadata, schema=schema)
+            for name in table_names
+            if sa_schema._get_table_key(name, schema) not in metadata.tables
+        ]
+        identity_sequences = self.get_multi_identity_sequences(schema)
+        for table in tables:
+            self.reflecttable(table, None)
+            if table.name in identity_sequences:
+                table.info['_foundationdb_identity_sequence'] = (
+                        schema or self.default_schema_name,
+                        identity_sequences[table.name])
+
+        if fingerprint is not None:
+            self._write_snapshot(snapshot, schema, fingerprint)
+        return tables
+
+    def save_snapshot(self, path, schema=None):
+        """Write the reflected information for a schema to a local file.
+
+        The file contains the information returned by
+        :meth:`.get_table_names` and the ``get_multi_*()`` methods,
+        along with a fingerprint of the schema, and may be loaded by
+        other processes using :meth:`.load_snapshot` as long as the
+        schema remains unchanged.
+
+        .. seealso::
+
+            :ref:`core_reflection_snapshot`
+
+        """
+        fingerprint = self.dialect._schema_fingerprint(self.bind, schema)
+        self._load_multi(schema)
+        self._write_snapshot(path, schema, fingerprint)
+
+    def load_snapshot(self, path, schema=None):
+        """Load a schema snapshot written by :meth:`.save_snapshot`.
+
+        The snapshot is checked against the database with a single
+        fingerprint query.  If it matches, this inspector's cache is
+        populated from it, so that reflection of the schema proceeds
+        without further queries, and True is returned.  If the file is
+        missing, unreadable or out of date, False is returned.
+
+        .. seealso::
+
+            :ref:`core_reflection_snapshot`
+
+        """
+        try:
+            with open(path, "rb") as file_:
+                snapshot = util.pickle.load(file_)
+        except Exception:
+            # a missing or unreadable snapshot is reflected anew
+            return False
+
+        schema_name = schema or self.default_schema_name
+        if not isinstance(snapshot, dict) or \
+                snapshot.get('version') != _SNAPSHOT_VERSION or \
+                snapshot.get('schema') != schema_name or \
+                snapshot.get('fingerprint') != \
+                self.dialect._schema_fingerprint(self.bind, schema):
+            return False
+
+        for kind, result in snapshot['reflection'].items():
+            self.info_cache[('foundationdb_multi', kind, schema_name)] = \
+                                                                    result
+        return True
+
+    def _load_multi(self, schema):
+        self.get_multi_columns(schema)
+        self.get_multi_pk_constraint(schema)
+        self.get_multi_unique_constraints(schema)
+        self.get_multi_foreign_keys(schema)
+        self.get_multi_indexes(schema)
+        self.get_multi_identity_sequences(schema)
+        return self.dialect._get_multi(
+                        self.bind, "table_names", schema, self.info_cache)
+
+    def _write_snapshot(self, path, schema, fingerprint):
+        schema_name = schema or self.default_schema_name
+        snapshot = {
+            'version': _SNAPSHOT_VERSION,
+            'schema': schema_name,
+            'fingerprint': fingerprint,
+            'reflection': dict(
+                (kind, self.dialect._get_multi(
+                            self.bind, kind, schema, self.info_cache))
+                for kind in _REFLECTION_KINDS
+            )
+        }
+
+        # write to a new file and move it into place, so that
+        # other processes never read a partial snapshot
+        tmp_path = "%s.%d.tmp" % (path, os.getpid())
+        with open(tmp_path, "wb") as file_:
+            util.pickle.dump(snapshot, file_, util.pickle.HIGHEST_PROTOCOL)
+        os.rename(tmp_path, path)
+
+_SNAPSHOT_VERSION = 1
+
+_REFLECTION_KINDS = (
+    "table_names", "columns", "pk_constraints", "unique_constraints",
+    "foreign_keys", "indexes", "identity_sequences"
+)
+
+
+
+def _fingerprint_sql():
+    # one branch per information_schema table; the values of each are
+    # cast to strings and padded to the same width, so that all of them
+    # are fetched by a single UNION ALL
+    fk_from = (
+        "FROM information_schema.table_constraints AS tc "
+        "JOIN information_schema.%s AS rc "
+            "ON tc.constraint_name=rc.constraint_name "
+            "AND tc.constraint_schema=rc.constraint_schema "
+        "JOIN information_schema.table_constraints AS rfnced ON "
+            "rc.unique_%sschema=rfnced.constraint_schema AND "
+            "rc.unique_constraint_name=rfnced.constraint_name "
+        "WHERE tc.table_schema=:schema"
+    )
+    branches = [
+        ("column", [
+            "c.table_name", "c.column_name", "c.ordinal_position",
+            "c.data_type", "c.character_maximum_length",
+            "c.numeric_precision", "c.numeric_scale", "c.is_nullable",
+            "c.column_default", "c.is_identity", "c.identity_start",
+            "c.identity_increment", "c.sequence_name"],
+            "FROM information_schema.columns AS c "
+            "WHERE c.table_schema=:schema"),
+        ("constraint", [
+            "tc.table_name", "tc.constraint_name", "tc.constraint_type"],
+            "FROM information_schema.table_constraints AS tc "
+            "WHERE tc.table_schema=:schema"),
+        ("key_column", [
+            "tc.table_name", "kcu.constraint_name", "kcu.column_name",
+            "kcu.ordinal_position"],
+            "FROM information_schema.table_constraints AS tc "
+            "JOIN information_schema.key_column_usage AS kcu ON "
+                "tc.constraint_name=kcu.constraint_name "
+                "AND tc.constraint_schema=kcu.constraint_schema "
+            "WHERE tc.table_schema=:schema"),
+        ("index", [
+            "ix.table_name", "ix.index_name", "ix.index_type",
+            "ix.is_unique"],
+            "FROM information_schema.indexes AS ix "
+            "WHERE ix.table_schema=:schema"),
+        ("index_column", [
+            "ic.index_table_name", "ic.index_name", "ic.column_name",
+            "ic.ordinal_position"],
+            "FROM information_schema.index_columns AS ic "
+            "WHERE ic.index_table_schema=:schema"),
+        ("foreign_key", [
+            "tc.table_name", "rc.constraint_name", "rfnced.table_schema",
+            "rfnced.table_name", "rc.unique_constraint_name",
+            "rc.match_option", "rc.update_rule", "rc.delete_rule"],
+            fk_from % ("referential_constraints", "constraint_")),
+        ("grouping", [
+            "tc.table_name", "rc.constraint_name", "rfnced.table_schema",
+            "rfnced.table_name", "rc.unique_constraint_name"],
+            fk_from % ("grouping_constraints", "")),
+    ]
+    width = max(len(cols) for kind, cols, from_ in branches)
+    return " UNION ALL ".join(
+        "SELECT '%s', %s %s" % (
+            kind,
+            ", ".join(
+                "CAST(%s AS VARCHAR(4096))" % col
+                for col in cols + ["NULL"] * (width - len(cols))
+            ),
+            from_
+        )
+        for kind, cols, from_ in branches
+    )
+
+_FINGERPRINT_SQL = _fingerprint_sql()
 
 
+class _NestedPlan(object):
+    """The processing plan for one nested column of a compiled statement.
+
+    Plans are stored on the compiled object, so that the nested result
+    structure is derived only once.  If the nested result contains no
+    further nested columns, its result metadata doesn't depend on
+    the execution and is cached here as well.
+
+    """
+    metadata = None
+
+    def __init__(self, result_struct):
+        self.result_struct = result_struct
+        if compat.sqla_10:
+            types = [elem[3] for elem in result_struct[0]]
+        else:
+            types = [elem[2] for elem in result_struct.values()]
+        self.has_nested = any(isinstance(t, NestedResult) for t in types)
+
+class _NestedContext(object):
+    """Stands in for the execution context of the nested cursors
+    delivered for one nested column, within one execution.
+
+    """
+    compiled = None
+    result_map = None
+    result_column_struct = None
+    exception = None
+    _translate_colname = None
+    metadata = None
+
+    def __init__(self, parent, plan):
+        self.plan = plan
+        if compat.sqla_10:
+            self.result_column_struct = plan.result_struct
+        else:
+            self.result_map = plan.result_struct
+        self.dialect = parent.dialect
+        self.execution_options = parent.execution_options
+        self.root_connection = parent.root_connection
+        self.engine = parent.engine
+        self.get_result_processor = parent.get_result_processor
+        self._echo = self.root_connection._echo and \
+                        self.engine._should_log_debug()
+
+    def handle_dbapi_exception(self, e):
+        pass
+
+    def _result_metadata(self, result):
+        # nested columns within this one produce processors bound
+        # to the current execution; only cache on the plan if there
+        # are none.
+        holder = self if self.plan.has_nested else self.plan
+        metadata = holder.metadata
+        if metadata is None:
+            description = result._cursor_description()
+            if description is None:
+                return None
+            metadata = holder.metadata = ResultMetaData(result, description)
+        return metadata
+
+class _SequenceBlock(object):
+    def __init__(self, increment):
+        self.increment = increment
+        self.values = collections.deque()
+        self.mutex = threading.Lock()
+
+class _SequenceAllocator(object):
+    """Hands out sequence values client side, reserving them from the
+    server in blocks.
+
+    If the sequence's increment is greater than one, a single
+    ``nextval()`` reserves every value up to the next increment
+    ("hi-lo"); otherwise ``block_size`` values are reserved using
+    a single SELECT.  Reserved values are shared by all connections
+    of the dialect.
+
+    """
+    def __init__(self, block_size):
+        self.block_size = block_size
+        self._blocks = {}
+        self._mutex = threading.Lock()
+
+    def next_value(self, context, key, nextval, increment, type_):
+        try:
+            block = self._blocks[key]
+        except KeyError:
+            with self._mutex:
+                block = self._blocks.setdefault(key, _SequenceBlock(increment))
+
+        with block.mutex:
+            if not block.values:
+                block.values.extend(
+                    self._reserve(context, block, key, nextval, type_))
+            return block.values.popleft()
+
+    def _reserve(self, context, block, key, nextval, type_):
+        if block.increment is None:
+            block.increment = context._sequence_increment(*key) or 1
+
+        if block.increment > 1:
+            hi = context._execute_scalar("select %s" % nextval, type_)
+            return range(hi, hi + block.increment)
+        else:
+            return context._execute_rows(
+                        "select %s from (values %s) as reserved (n)" % (
+                            nextval,
+                            ", ".join("(%d)" % (i + 1)
+                                for i in range(self.block_size))
+                        ), type_)
+
+_CHUNK_PIECE_SIZE = 100
+
+def _parameter_size(params):
+    """Estimate the size in bytes of one set of parameters."""
+
+    size = 0
+    for value in (params.values() if isinstance(params, dict) else params):
+        if isinstance(value, (util.string_types, util.binary_type)):
+            size += len(value)
+        else:
+            size += 8
+    return size
 
 class FDBExecutionContext(default.DefaultExecutionContext):
+    @util.memoized_property
+    def _foundationdb_nested_processors(self):
+        return {}
+
     def get_result_processor(self, type_, colname, coltype):
-        if self.compiled and hasattr(self.compiled, '_foundationdb_nested') and type_ in self.compiled._foundationdb_nested:
-            class NestedContext(object):
-                if compat.sqla_10:
-                    result_column_struct = \
-                        self.compiled._foundationdb_nested[type_]
-                else:
-                    result_map = self.compiled._foundationdb_nested[type_]
-                compiled = None
-                dialect = self.dialect
-                root_connection = self.root_connection
-                engine = self.engine
-                _translate_colname = None
-                get_result_processor = self.get_result_processor
-
-                def __init__(self, value):
-                    self.cursor = value
-
-            return type_.foundationdb_result_processor(NestedContext)
+        compiled = self.compiled
+        if compiled is not None and \
+                type_ in getattr(compiled, '_foundationdb_nested', ()):
+            try:
+                return self._foundationdb_nested_processors[type_]
+            except KeyError:
+                nested_context = _NestedContext(
+                            self, compiled._foundationdb_nested_plan(type_))
+                processor = self._foundationdb_nested_processors[type_] = \
+                    type_.foundationdb_result_processor(nested_context)
+                return processor
         else:
             return type_._cached_result_processor(self.dialect, coltype)
 
     def fire_sequence(self, seq, type_):
-        return self._execute_scalar(
-                "select nextval('%s', '%s')" % (
-                    seq.schema or self.dialect.default_schema_name,
-                    self.dialect.identifier_preparer.format_sequence(seq)),
-                type_)
+        schema = seq.schema or self.dialect.default_schema_name
+        nextval = "nextval('%s', '%s')" % (
+                    schema,
+                    self.dialect.identifier_preparer.format_sequence(seq))
+
+        allocator = self.dialect._sequence_allocator
+        if allocator is not None:
+            return allocator.next_value(
+                        self, (schema, seq.name), nextval,
+                        seq.increment, type_)
+        return self._execute_scalar("select %s" % nextval, type_)
+
+    _foundationdb_rowcount = None
+
+    @property
+    def rowcount(self):
+        if self._foundationdb_rowcount is not None:
+            return self._foundationdb_rowcount
+        return self.cursor.rowcount
+
+    def _chunked_executemany(self, cursor, statement, parameters):
+        """Execute the given parameter sets in pieces, committing
+        whenever the transaction reaches the size or duration limits
+        given by the execution options or the dialect."""
+
+        if self.root_connection.in_transaction():
+            raise exc.InvalidRequestError(
+                "The foundationdb_chunked execution option commits as it "
+                "goes, and can't be used within a transaction")
+
+        opts = self.execution_options
+        max_bytes = opts.get('foundationdb_chunk_max_bytes',
+                                self.dialect.chunk_max_bytes)
+        max_seconds = opts.get('foundationdb_chunk_max_seconds',
+                                self.dialect.chunk_max_seconds)
+        progress = opts.get('foundationdb_chunk_progress')
+        total = len(parameters)
+
+        def commit(committed):
+            self._dbapi_connection.commit()
+            if progress is not None:
+                progress(committed, total)
+
+        rowcount = 0
+        txn_bytes = 0
+        txn_start = time.time()
+        for start in range(opts.get('foundationdb_chunk_resume', 0),
+                                total, _CHUNK_PIECE_SIZE):
+            piece = parameters[start:start + _CHUNK_PIECE_SIZE]
+            piece_bytes = sum(_parameter_size(params) for params in piece)
+            if txn_bytes and txn_bytes + piece_bytes > max_bytes:
+                commit(start)
+                txn_bytes = 0
+                txn_start = time.time()
+
+            cursor.executemany(statement, piece)
+            if cursor.rowcount > 0:
+                rowcount += cursor.rowcount
+            txn_bytes += piece_bytes
+
+            if time.time() - txn_start >= max_seconds:
+                commit(start + len(piece))
+                txn_bytes = 0
+                txn_start = time.time()
+
+        if txn_bytes:
+            commit(total)
+        self._foundationdb_rowcount = rowcount
+
+    def _execute_rows(self, stmt, type_):
+        """Execute a string statement on the current cursor, returning
+        the first column of each row.
+
+        This is the multiple-row version of ``_execute_scalar()``.
+
+        """
+        conn = self.root_connection
+        if self.dialect.positional:
+            default_params = self.dialect.execute_sequence_format()
+        else:
+            default_params = {}
+
+        conn._cursor_execute(self.cursor, stmt, default_params, context=self)
+        values = [row[0] for row in self.cursor.fetchall()]
+        if type_ is not None:
+            proc = type_._cached_result_processor(
+                self.dialect,
+                self.cursor.description[0][1]
+            )
+            if proc:
+                return [proc(value) for value in values]
+        return values
+
+    def _sequence_increment(self, schema, seq_name):
+        return self.connection.scalar(
+            sql.text(
+                "select increment from information_schema.sequences "
+                "where sequence_schema=:schema and sequence_name=:name"
+            ).bindparams(schema=schema, name=seq_name)
+        )
 
     def _table_identity_sequence(self, table):
         if '_foundationdb_identity_sequence' not in table.info:
@@ -347,8 +1117,14 @@ class FDBExecutionContext(default.DefaultExecutionContext):
 
                 schema, seq_name = self._table_identity_sequence(column.table)
 
-                stmt = "select nextval('\"%s\".\"%s\"')" % (schema, seq_name)
-                return self._execute_scalar(stmt, column.type)
+                nextval = "nextval('\"%s\".\"%s\"')" % (schema, seq_name)
+
+                allocator = self.dialect._sequence_allocator
+                if allocator is not None:
+                    return allocator.next_value(
+                                self, (schema, seq_name), nextval,
+                                None, column.type)
+                return self._execute_scalar("select %s" % nextval, column.type)
 
         return super(FDBExecutionContext, self).get_insert_default(column)
 
@@ -371,6 +1147,7 @@ class FDBDialect(default.DefaultDialect):
 
     supports_default_values = True
     supports_empty_insert = False
+    supports_multivalues_insert = True
     default_paramstyle = 'pyformat'
     ischema_names = ischema_names
     colspecs = colspecs
@@ -393,14 +1170,151 @@ class FDBDialect(default.DefaultDialect):
         })
     ]
 
-    def __init__(self, **kwargs):
+    retryable_sqlstates = frozenset(['40001', '40002', '40004'])
+    """SQLSTATEs of errors which abort a transaction such that it may
+    be run again, such as FoundationDB commit conflicts and transactions
+    exceeding the maximum transaction age.  See :class:`.retry`."""
+
+    _isolation_lookup = set(['SERIALIZABLE', 'SNAPSHOT'])
+
+    def __init__(self, sequence_block_size=None, insert_batch_size=1000,
+                        retryable_sqlstates=None, chunk_max_bytes=1000000,
+                        chunk_max_seconds=2.0, isolation_level=None,
+                        **kwargs):
         default.DefaultDialect.__init__(self, **kwargs)
+        self.isolation_level = isolation_level
+        self.chunk_max_bytes = int(chunk_max_bytes)
+        self.chunk_max_seconds = float(chunk_max_seconds)
+        if retryable_sqlstates is not None:
+            self.retryable_sqlstates = frozenset(retryable_sqlstates)
+        self.insert_batch_size = int(insert_batch_size)
+        self.sequence_block_size = sequence_block_size
+        if sequence_block_size:
+            self._sequence_allocator = _SequenceAllocator(
+                                                int(sequence_block_size))
+        else:
+            self._sequence_allocator = None
+
+    # server capabilities; these defaults describe current servers,
+    # and are established against the actual server in initialize().
+
+    qualified_constraint_names = False
+    """Server reports primary key and unique constraint names qualified
+    with their table name, as in ``"customer.pkey"``."""
+
+    supports_nested_cursors = True
+    """The DBAPI connection can deliver nested result sets; established
+    by the DBAPI-specific dialect."""
 
     def initialize(self, connection):
         super(FDBDialect, self).initialize(connection)
+        self._set_server_capabilities(self.server_version_info)
+
+    def _set_server_capabilities(self, server_version_info):
+        self.qualified_constraint_names = server_version_info <= (1, 9, 5)
 
     def on_connect(self):
-        return None
+        if self.isolation_level is not None:
+            def on_connect(conn):
+                self.set_isolation_level(conn, self.isolation_level)
+            return on_connect
+        else:
+            return None
+
+    def _set_transaction_characteristics(self, dbapi_conn, characteristics):
+        cursor = dbapi_conn.cursor()
+        cursor.execute(
+            "SET SESSION CHARACTERISTICS AS TRANSACTION %s" % characteristics)
+        cursor.execute("COMMIT")
+        cursor.close()
+
+    def _isolation_level_characteristics(self, level):
+        level = level.replace('_', ' ')
+        if level not in self._isolation_lookup:
+            raise exc.ArgumentError(
+                "Invalid value '%s' for isolation_level. "
+                "Valid isolation levels for %s are %s" %
+                (level, self.name, ", ".join(sorted(self._isolation_lookup)))
+            )
+        return "ISOLATION LEVEL %s" % level
+
+    def set_isolation_level(self, connection, level):
+        self._set_transaction_characteristics(
+                connection, self._isolation_level_characteristics(level))
+
+    def get_isolation_level(self, connection):
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SHOW TRANSACTION ISOLATION LEVEL")
+            val = cursor.fetchone()[0]
+        except self.dbapi.Error:
+            # older servers can't report the isolation level; the
+            # transaction the statement began is aborted.
+            connection.rollback()
+            raise NotImplementedError("get_isolation_level")
+        finally:
+            cursor.close()
+        return val.upper()
+
+    def reset_isolation_level(self, dbapi_conn):
+        self.set_isolation_level(dbapi_conn,
+                    self.default_isolation_level or 'SERIALIZABLE')
+
+    def set_read_only(self, connection, value):
+        """Set the transactions of the given DBAPI connection to be
+        read-only, or read-write."""
+
+        self._set_transaction_characteristics(
+                    connection, "READ ONLY" if value else "READ WRITE")
+
+    def reset_read_only(self, dbapi_conn):
+        self.set_read_only(dbapi_conn, False)
+
+    def set_engine_execution_options(self, engine, opts):
+        super(FDBDialect, self).set_engine_execution_options(engine, opts)
+        if 'foundationdb_read_only' in opts:
+            read_only = opts['foundationdb_read_only']
+
+            @event.listens_for(engine, "engine_connect")
+            def set_read_only(connection, branch):
+                if not branch:
+                    self._set_connection_read_only(connection, read_only)
+
+    def set_connection_execution_options(self, connection, opts):
+        super(FDBDialect, self).set_connection_execution_options(
+                                                        connection, opts)
+        if 'foundationdb_read_only' in opts:
+            self._set_connection_read_only(
+                                connection, opts['foundationdb_read_only'])
+
+    def _set_connection_read_only(self, connection, value):
+        if connection.in_transaction():
+            util.warn(
+                "Connection is already established with a Transaction; "
+                "setting foundationdb_read_only will take effect for the "
+                "next transaction")
+        self.set_read_only(connection.connection, value)
+        connection.connection._connection_record.\
+            finalize_callback.append(self.reset_read_only)
+
+    def do_executemany(self, cursor, statement, parameters, context=None):
+        if context is not None and \
+                context.execution_options.get('foundationdb_chunked', False):
+            context._chunked_executemany(cursor, statement, parameters)
+        else:
+            cursor.executemany(statement, parameters)
+
+    def _error_sqlstate(self, dbapi_error):
+        return getattr(dbapi_error, 'pgcode', None)
+
+    def is_retryable(self, error):
+        """Return True if the given
+        :class:`~sqlalchemy:sqlalchemy.exc.DBAPIError` aborted its
+        transaction such that the transaction may be run again."""
+
+        return isinstance(error, exc.DBAPIError) and \
+            not error.connection_invalidated and \
+            self._error_sqlstate(error.orig) in self.retryable_sqlstates
 
     def _get_default_schema_name(self, connection):
         return connection.scalar("select CURRENT_SCHEMA")
@@ -432,8 +1346,11 @@ class FDBDialect(default.DefaultDialect):
         return bool(cursor.first())
 
     def _get_server_version_info(self, connection):
-        ver = connection.scalar("select server_version from "
-                    "information_schema.server_instance_summary")
+        return self._parse_server_version(
+                    connection.scalar("select server_version from "
+                    "information_schema.server_instance_summary"))
+
+    def _parse_server_version(self, ver):
         m = re.search('(\d+)\.(\d+)\.(\d+)', ver)
         if (m):
             return (int(m.group(1)), int(m.group(2)), int(m.group(3)))
@@ -449,8 +1366,10 @@ class FDBDialect(default.DefaultDialect):
 
     @reflection.cache
     def get_table_names(self, connection, schema=None, **kw):
-        schema = schema or self.default_schema_name
+        return self._load_table_names(connection,
+                                    schema or self.default_schema_name)
 
+    def _load_table_names(self, connection, schema):
         cursor = connection.execute(
             sql.text(
             "select table_name from information_schema.tables "
@@ -460,6 +1379,22 @@ class FDBDialect(default.DefaultDialect):
         )
         return [row[0] for row in cursor.fetchall()]
 
+    def _schema_fingerprint(self, connection, schema=None):
+        """Return a digest of the reflected information of a schema:
+        its tables and columns, including their types and defaults,
+        and its constraints and indexes, including their columns and
+        the tables referred to by foreign keys."""
+
+        rows = sorted(
+            u"\x1f".join(u"%s" % (value, ) for value in row)
+            for row in connection.execute(
+                    text(_FINGERPRINT_SQL),
+                    {"schema": schema or self.default_schema_name})
+        )
+        digest = hashlib.sha1()
+        for row in rows:
+            digest.update(row.encode("utf-8") + b"\x1e")
+        return digest.hexdigest()
 
     @reflection.cache
     def get_view_names(self, connection, schema=None, **kw):
@@ -484,24 +1419,145 @@ class FDBDialect(default.DefaultDialect):
         )
         return cursor.scalar()
 
+    # schema reflection.   Each of the _load_*() methods below fetches
+    # its information for all tables in a schema, or a single table,
+    # with one query per information_schema table.  The per-table
+    # reflection methods are served from the whole-schema result when
+    # it has been loaded into the reflection cache by one of the
+    # get_multi_*() methods, and otherwise query for just the one table.
+
+    def _get_multi(self, connection, kind, schema, info_cache):
+        schema = schema or self.default_schema_name
+        key = ('foundationdb_multi', kind, schema)
+        if info_cache is not None and key in info_cache:
+            return info_cache[key]
+        result = getattr(self, "_load_%s" % kind)(connection, schema)
+        if info_cache is not None:
+            info_cache[key] = result
+        return result
+
+    def _get_for_table(self, connection, kind, table_name, schema, info_cache):
+        schema = schema or self.default_schema_name
+        result = None
+        if info_cache is not None:
+            result = info_cache.get(('foundationdb_multi', kind, schema))
+        if result is None:
+            result = getattr(self, "_load_%s" % kind)(
+                                        connection, schema, table_name)
+        return result.get(table_name, [])
+
+    def _table_criteria(self, alias, table_name):
+        if table_name is None:
+            return ""
+        else:
+            return "AND %s.table_name=:table " % alias
+
+    def _table_params(self, schema, table_name, **kw):
+        kw["schema"] = schema
+        if table_name is not None:
+            kw["table"] = table_name
+        return kw
+
+    def _referred_schema(self, fks, schema):
+        # foreign keys referring to the default schema are loaded with
+        # a referred_schema of None; report the schema as given instead
+        if schema is None:
+            return fks
+        return [dict(fk, referred_schema=fk['referred_schema'] or schema)
+                    for fk in fks]
+
+    def get_multi_columns(self, connection, schema=None, **kw):
+        """Return the :meth:`.get_columns` information for all tables
+        of a schema, as a dictionary keyed on table name."""
+        return self._get_multi(connection, "columns", schema,
+                                    kw.get('info_cache'))
+
+    def get_multi_pk_constraint(self, connection, schema=None, **kw):
+        """Return the :meth:`.get_pk_constraint` information for all tables
+        of a schema, as a dictionary keyed on table name."""
+        return dict(
+            (table_name, pks[0]) for table_name, pks in
+            self._get_multi(connection, "pk_constraints", schema,
+                                    kw.get('info_cache')).items()
+        )
+
+    def get_multi_unique_constraints(self, connection, schema=None, **kw):
+        """Return the :meth:`.get_unique_constraints` information for all
+        tables of a schema, as a dictionary keyed on table name."""
+        return self._get_multi(connection, "unique_constraints", schema,
+                                    kw.get('info_cache'))
+
+    def get_multi_foreign_keys(self, connection, schema=None, **kw):
+        """Return the :meth:`.get_foreign_keys` information for all tables
+        of a schema, as a dictionary keyed on table name."""
+        return dict(
+            (table_name, self._referred_schema(fks, schema))
+            for table_name, fks in
+            self._get_multi(connection, "foreign_keys", schema,
+                                    kw.get('info_cache')).items()
+        )
+
+    def get_multi_indexes(self, connection, schema=None, **kw):
+        """Return the :meth:`.get_indexes` information for all tables
+        of a schema, as a dictionary keyed on table name."""
+        return self._get_multi(connection, "indexes", schema,
+                                    kw.get('info_cache'))
+
+    def get_multi_identity_sequences(self, connection, schema=None, **kw):
+        """Return the name of the sequence behind the IDENTITY column of
+        each table of a schema, as a dictionary keyed on table name."""
+        return self._get_multi(connection, "identity_sequences", schema,
+                                    kw.get('info_cache'))
+
     @reflection.cache
     def get_columns(self, connection, table_name, schema=None, **kw):
+        return self._get_for_table(connection, "columns", table_name,
+                                    schema, kw.get('info_cache'))
+
+    @reflection.cache
+    def get_unique_constraints(self, connection, table_name, schema=None, **kw):
+        return self._get_for_table(connection, "unique_constraints",
+                                    table_name, schema, kw.get('info_cache'))
+
+    @reflection.cache
+    def get_pk_constraint(self, connection, table_name, schema=None, **kw):
+        pks = self._get_for_table(connection, "pk_constraints",
+                                    table_name, schema, kw.get('info_cache'))
+        if pks:
+            return pks[0]
+        else:
+            return None
+
+    @reflection.cache
+    def get_foreign_keys(self, connection, table_name, schema=None, **kw):
+        return self._referred_schema(
+                    self._get_for_table(connection, "foreign_keys",
+                                    table_name, schema, kw.get('info_cache')),
+                    schema)
+
+    @reflection.cache
+    def get_indexes(self, connection, table_name, schema, **kw):
+        return self._get_for_table(connection, "indexes",
+                                    table_name, schema, kw.get('info_cache'))
+
+    def _load_columns(self, connection, schema, table_name=None):
         stmt = text(
-                    "SELECT column_name, data_type, is_nullable, "
+                    "SELECT table_name, column_name, data_type, is_nullable, "
                     "character_maximum_length, "
                     "numeric_precision, numeric_scale, "
                     "column_default, "
                     "is_identity, identity_start, identity_increment "
-                    "FROM information_schema.columns "
-                    "WHERE table_schema=:schema AND table_name=:table "
-                    "ORDER BY ordinal_position").bindparams(
-                        schema=schema or self.default_schema_name,
-                        table=table_name
+                    "FROM information_schema.columns AS c "
+                    "WHERE c.table_schema=:schema %s"
+                    "ORDER BY c.table_name, c.ordinal_position" %
+                        self._table_criteria("c", table_name)
                     )
+        params = self._table_params(schema, table_name)
 
-        columns = []
-        for cname, type_, nullable, length, precision, \
-            scale, default, is_ident, ident_start, ident_increment in connection.execute(stmt):
+        tables = {}
+        for tname, cname, type_, nullable, length, precision, \
+            scale, default, is_ident, ident_start, ident_increment in \
+                connection.execute(stmt, params):
 
             try:
                 coltype = self.ischema_names[type_]
@@ -526,32 +1582,32 @@ class FDBDialect(default.DefaultDialect):
             column_info = dict(name=cname, type=coltype, nullable=nullable,
                            default=default, autoincrement=autoincrement)
 
-            columns.append(column_info)
-        return columns
+            tables.setdefault(tname, []).append(column_info)
+        return tables
 
-    @reflection.cache
-    def get_unique_constraints(self, connection, table_name, schema=None, **kw):
-        return self._get_uq_pk_constraints(connection, "UNIQUE", table_name,
-                                                schema, **kw)
-
-    @reflection.cache
-    def get_pk_constraint(self, connection, table_name, schema=None, **kw):
-        pks = self._get_uq_pk_constraints(connection, "PRIMARY KEY", table_name,
-                                                schema, **kw)
-        if pks:
-            return pks[0]
-        else:
-            return None
+    def _load_identity_sequences(self, connection, schema, table_name=None):
+        stmt = text(
+                    "SELECT c.table_name, c.sequence_name "
+                    "FROM information_schema.columns AS c "
+                    "WHERE c.table_schema=:schema %s"
+                    "AND c.sequence_name IS NOT NULL" %
+                        self._table_criteria("c", table_name)
+                    )
+        return dict(
+            connection.execute(stmt,
+                            self._table_params(schema, table_name)).fetchall()
+        )
 
-    def _get_uq_pk_constraints(self, connection, type_, table_name, schema=None, **kw):
-        schema = schema or self.default_schema_name
+    def _load_unique_constraints(self, connection, schema, table_name=None):
+        return self._load_uq_pk_constraints(connection, "UNIQUE",
+                                                schema, table_name)
 
-        stmt = text("SELECT tc.constraint_name "
-                "FROM information_schema.table_constraints AS tc "
-                "WHERE tc.table_schema=:schema AND tc.table_name=:table "
-                "AND tc.constraint_type=:type"
-            ).bindparams(schema=schema, table=table_name, type=type_)
+    def _load_pk_constraints(self, connection, schema, table_name=None):
+        return self._load_uq_pk_constraints(connection, "PRIMARY KEY",
+                                                schema, table_name)
 
+    def _load_uq_pk_constraints(self, connection, type_, schema,
+                                                table_name=None):
         if type_ == 'PRIMARY KEY':
             col_collection = 'constrained_columns'
         elif type_ == 'UNIQUE':
@@ -559,129 +1615,127 @@ class FDBDialect(default.DefaultDialect):
         else:
             assert False
 
-        constraints = {}
-        for const_name, in connection.execute(stmt):
-            if (self._get_server_version_info(connection) <= (1,9,5)):
-                cname = const_name.split('.')[1]
-            else:
-                cname = const_name
-            constraints[const_name] = {'name': cname, col_collection: []}
-
-        stmt = text("SELECT tc.constraint_name, kcu.column_name "
+        stmt = text("SELECT tc.table_name, tc.constraint_name, "
+                "kcu.column_name "
                 "FROM information_schema.table_constraints AS tc "
                 " JOIN information_schema.key_column_usage AS kcu ON "
                     "tc.constraint_name=kcu.constraint_name "
                     "AND tc.constraint_schema=kcu.constraint_schema "
-                    "WHERE tc.table_schema=:schema AND tc.table_name=:table "
+                    "WHERE tc.table_schema=:schema %s"
                     "AND tc.constraint_type=:type "
-                    "ORDER BY kcu.ordinal_position"
-                ).bindparams(schema=schema, table=table_name, type=type_)
+                    "ORDER BY tc.table_name, tc.constraint_name, "
+                    "kcu.ordinal_position" %
+                    self._table_criteria("tc", table_name)
+                )
+        params = self._table_params(schema, table_name, type=type_)
 
-        for const_name, colname in connection.execute(stmt):
-            constraints[const_name][col_collection].append(colname)
+        tables = {}
+        constraints = {}
+        for tname, const_name, colname in connection.execute(stmt, params):
+            if (tname, const_name) not in constraints:
+                if self.qualified_constraint_names:
+                    cname = const_name.split('.')[1]
+                else:
+                    cname = const_name
+                constraints[(tname, const_name)] = const = \
+                                {'name': cname, col_collection: []}
+                tables.setdefault(tname, []).append(const)
+            constraints[(tname, const_name)][col_collection].append(colname)
 
-        return list(constraints.values())
+        return tables
 
-    @reflection.cache
-    def get_foreign_keys(self, connection, table_name, schema=None, **kw):
-        fks = {}
+    def _load_foreign_keys(self, connection, schema, table_name=None):
+        tables = {}
         for grouping in False, True:
-            stmt = text("SELECT rc.constraint_name, rfnced.table_schema, "
-                            "rfnced.table_name %s"
+            stmt = text("SELECT tc.table_name, rc.constraint_name, "
+                            "rfnced.table_schema, rfnced.table_name, "
+                            "lcl.column_name, rmt.column_name %s"
                     "FROM information_schema.table_constraints AS tc "
                     "JOIN information_schema.%s AS rc "
                         "ON tc.constraint_name=rc.constraint_name "
                         "AND tc.constraint_schema=rc.constraint_schema "
                     "JOIN information_schema.table_constraints AS rfnced ON "
-                    "rc.unique_%sschema=rfnced.constraint_schema AND "
-                    "rc.unique_constraint_name=rfnced.constraint_name "
-                    "WHERE tc.table_schema=:schema AND tc.table_name=:table "
-                    % (
-                            ", rc.match_option, rc.update_rule, rc.delete_rule "
-                                if not grouping else ", NULL, NULL, NULL ",
-                            "referential_constraints"
-                                if not grouping else "grouping_constraints",
-                            "constraint_"
-                                if not grouping else "",
-                        )
-                ).bindparams(schema=schema or self.default_schema_name, table=table_name)
-
-            for conname, referred_schema, referred_table, match, onupdate, ondelete in connection.execute(stmt):
-                fks[conname] = {
-                    'name': conname,
-                    'constrained_columns': [],
-                    'referred_schema': referred_schema
-                                    if referred_schema != self.default_schema_name
-                                    else schema,
-                    'referred_table': referred_table,
-                    'referred_columns': [],
-                    'options': {
-                        'foundationdb_grouping': grouping,
-                        'match': match,
-                        'onupdate': onupdate,
-                        'ondelete': ondelete,
-                    }
-                }
-
-            stmt = text("SELECT rc.constraint_name, lcl.column_name as lcn, rmt.column_name as rcn"
-                    " FROM information_schema.table_constraints AS tc "
-                    " JOIN information_schema.%s AS rc "
-                        "ON tc.constraint_name=rc.constraint_name "
-                        "AND tc.constraint_schema=rc.constraint_schema "
-                    " JOIN information_schema.key_column_usage AS lcl ON "
+                        "rc.unique_%sschema=rfnced.constraint_schema AND "
+                        "rc.unique_constraint_name=rfnced.constraint_name "
+                    "JOIN information_schema.key_column_usage AS lcl ON "
                         "rc.constraint_name=lcl.constraint_name "
                         "AND rc.constraint_schema=lcl.constraint_schema "
-                    " JOIN information_schema.key_column_usage AS rmt ON "
+                    "JOIN information_schema.key_column_usage AS rmt ON "
                         "rc.unique_%sschema=rmt.constraint_schema AND "
                         "rc.unique_constraint_name=rmt.constraint_name AND "
                         "lcl.ordinal_position=rmt.ordinal_position "
-                        "WHERE tc.table_schema=:schema AND tc.table_name=:table "
-                        "ORDER BY lcl.ordinal_position" %
-                        (
+                    "WHERE tc.table_schema=:schema %s"
+                    "ORDER BY tc.table_name, rc.constraint_name, "
+                        "lcl.ordinal_position"
+                    % (
+                            ", rc.match_option, rc.update_rule, rc.delete_rule "
+                                if not grouping else ", NULL, NULL, NULL ",
                             "referential_constraints"
                                 if not grouping else "grouping_constraints",
                             "constraint_"
                                 if not grouping else "",
+                            "constraint_"
+                                if not grouping else "",
+                            self._table_criteria("tc", table_name)
                         )
-                    ).bindparams(schema=schema or self.default_schema_name, table=table_name)
-
-
-            for cname, lclname, rmtname in connection.execute(stmt):
-                fk = fks[cname]
+                )
+            params = self._table_params(schema, table_name)
+
+            fks = {}
+            for tname, conname, referred_schema, referred_table, \
+                    lclname, rmtname, match, onupdate, ondelete in \
+                    connection.execute(stmt, params):
+                if (tname, conname) not in fks:
+                    fks[(tname, conname)] = fk = {
+                        'name': conname,
+                        'constrained_columns': [],
+                        'referred_schema': referred_schema
+                                    if referred_schema !=
+                                            self.default_schema_name
+                                    else None,
+                        'referred_table': referred_table,
+                        'referred_columns': [],
+                        'options': {
+                            'foundationdb_grouping': grouping,
+                            'match': match,
+                            'onupdate': onupdate,
+                            'ondelete': ondelete,
+                        }
+                    }
+                    tables.setdefault(tname, []).append(fk)
+                fk = fks[(tname, conname)]
                 fk['constrained_columns'].append(lclname)
                 fk['referred_columns'].append(rmtname)
-        return list(fks.values())
-
-    @reflection.cache
-    def get_indexes(self, connection, table_name, schema, **kw):
-        schema = schema or self.default_schema_name
+        return tables
 
+    def _load_indexes(self, connection, schema, table_name=None):
         # note: foundationdb doubles unique indexes as unique
         # constraints, the same way as Postgresql does.
 
-        stmt = text("SELECT ix.index_name, ix.is_unique "
-                "FROM information_schema.indexes AS ix "
-                "WHERE ix.table_schema=:schema AND ix.table_name=:table "
-                "AND ix.index_type in ('INDEX', 'UNIQUE')"
-            ).bindparams(schema=schema, table=table_name)
-
-        constraints = {}
-        for const_name, is_unique in connection.execute(stmt):
-            constraints[const_name] = {
-                    'name': const_name, "column_names": [],
-                    'unique': is_unique == 'YES'}
-
-        stmt = text("SELECT ix.index_name, ic.column_name "
+        stmt = text("SELECT ix.table_name, ix.index_name, ix.is_unique, "
+                "ic.column_name "
                 "FROM information_schema.indexes AS ix "
                 " JOIN information_schema.index_columns AS ic ON "
                     "ix.index_name=ic.index_name "
                     "AND ix.table_schema=ic.index_table_schema "
-                    "WHERE ix.table_schema=:schema AND ix.table_name=:table "
-                    "AND ix.index_type in ('INDEX', 'UNIQUE')"
-                    "ORDER BY ic.ordinal_position"
-                ).bindparams(schema=schema, table=table_name)
-
-        for const_name, colname in connection.execute(stmt):
-            constraints[const_name]["column_names"].append(colname)
-
-        return list(constraints.values())
+                    "AND ix.table_name=ic.index_table_name "
+                    "WHERE ix.table_schema=:schema %s"
+                    "AND ix.index_type in ('INDEX', 'UNIQUE') "
+                    "ORDER BY ix.table_name, ix.index_name, "
+                    "ic.ordinal_position" %
+                    self._table_criteria("ix", table_name)
+                )
+        params = self._table_params(schema, table_name)
+
+        tables = {}
+        indexes = {}
+        for tname, index_name, is_unique, colname in \
+                connection.execute(stmt, params):
+            if (tname, index_name) not in indexes:
+                indexes[(tname, index_name)] = index = {
+                        'name': index_name, "column_names": [],
+                        'unique': is_unique == 'YES'}
+                tables.setdefault(tname, []).append(index)
+            indexes[(tname, index_name)]["column_names"].append(colname)
+
+        return tables
@@ -4,18 +4,186 @@ driver.
 """
 from __future__ import absolute_import
 
+import collections
+import re
+
+from sqlalchemy import util
+from sqlalchemy.engine.result import BufferedRowResultProxy
+from sqlalchemy.sql import expression
+
 from .base import FDBDialect, FDBExecutionContext, FDBCompiler
 
 from foundationdb_sql import psycopg2 as fdb_psycopg2
 
+DEFAULT_PREPARED_STATEMENT_CACHE_SIZE = 100
+
+DEFAULT_SERVER_SIDE_BATCH_SIZE = 1000
+
+SERVER_SIDE_CURSOR_RE = re.compile(r'\s*SELECT', re.I | re.UNICODE)
+
+_server_side_id = util.counter()
+
+_pyformat_bind = re.compile(r"%\(([^)]+)\)s|%%")
+
+def _prepared_form(statement):
+    """Convert a pyformat statement to the ``$n`` parameter form accepted
+    by PREPARE, returning it along with the parameter names in order."""
+
+    names = []
+    positions = {}
+
+    def repl(m):
+        name = m.group(1)
+        if name is None:
+            return "%"
+        if name not in positions:
+            names.append(name)
+            positions[name] = len(names)
+        return "$%d" % positions[name]
+    return _pyformat_bind.sub(repl, statement), names
+
+class _PreparedStatements(object):
+    """The statements PREPAREd on one DBAPI connection, as an LRU cache
+    of statement text to the EXECUTE statement which invokes it."""
+
+    def __init__(self, size):
+        self.size = size
+        self.statements = collections.OrderedDict()
+        self.counter = 0
+
+    def execute_statement(self, context, statement):
+        try:
+            execute = self.statements.pop(statement)
+        except KeyError:
+            # entered only once PREPAREd, so that a statement which
+            # fails to PREPARE is attempted again next time
+            execute = self._prepare(context, statement)
+        self.statements[statement] = execute
+
+        while len(self.statements) > self.size:
+            name = self.statements.popitem(last=False)[1][0]
+            self._execute(context, "DEALLOCATE %s" % name)
+        return execute[1]
+
+    def _prepare(self, context, statement):
+        self.counter += 1
+        name = "sqla_fdb_%d" % self.counter
+        prepared, names = _prepared_form(statement)
+
+        self._execute(context, "PREPARE %s AS %s" % (name, prepared))
+
+        if names:
+            execute = "EXECUTE %s (%s)" % (
+                name, ", ".join("%%(%s)s" % n for n in names))
+        else:
+            execute = "EXECUTE %s" % name
+        return name, execute
+
+    def _execute(self, context, statement):
+        # executed without parameters, so that the DBAPI sends the
+        # statement as is
+        cursor = context._dbapi_connection.cursor()
+        try:
+            context.root_connection._cursor_execute(
+                                    cursor, statement, None, context=context)
+        finally:
+            cursor.close()
+
+
+def _server_side_batch_size(execution_options):
+    """Return the number of rows to fetch at a time from a server side
+    cursor, given the ``stream_results`` execution option, which is
+    either True or a number of rows.
+
+    As of SQLAlchemy 1.0, :meth:`~sqlalchemy:sqlalchemy.orm.query.Query.yield_per`
+    also sets ``max_row_buffer`` to its count, which is used when
+    ``stream_results`` is True; in 0.9 it sets only ``stream_results``.
+
+    """
+    stream = execution_options.get('stream_results', True)
+    if stream is True:
+        return execution_options.get(
+                    'max_row_buffer', DEFAULT_SERVER_SIDE_BATCH_SIZE)
+    else:
+        return int(stream)
+
+class ServerSideResultProxy(BufferedRowResultProxy):
+    """A :class:`~sqlalchemy:sqlalchemy.engine.ResultProxy` fetching the
+    rows of a server side cursor a fixed number at a time.
+
+    Nested columns of the rows are delivered as for a regular cursor;
+    only the parent rows are fetched in batches.
+
+    """
+    size_growth = {}
+
+    def _init_metadata(self):
+        self._bufsize = _server_side_batch_size(
+                                    self.context.execution_options)
+        super(ServerSideResultProxy, self)._init_metadata()
+
 
 class FDBPsycopg2ExecutionContext(FDBExecutionContext):
+    _foundationdb_server_side = False
+
+    def pre_exec(self):
+        super(FDBPsycopg2ExecutionContext, self).pre_exec()
+
+        # a server side cursor DECLAREs the statement itself
+        if self._foundationdb_server_side or \
+                self.isddl or not self.compiled or self.compiled.positional or \
+                not self.execution_options.get('foundationdb_prepared',
+                        self.dialect.prepared_statement_cache_size > 0):
+            return
+
+        prepared = self.dialect._prepared_statements(
+                                self._dbapi_connection.connection)
+        if prepared is not None:
+            self.statement = prepared.execute_statement(
+                                self, self.statement)
+
+    def _use_server_side_cursor(self):
+        if not self.dialect.supports_server_side_cursors or self.isddl:
+            return False
+
+        if self.dialect.server_side_cursors:
+            stream = self.execution_options.get('stream_results', True)
+        else:
+            stream = self.execution_options.get('stream_results', False)
+
+        # only a SELECT can be DECLAREd as a cursor
+        return bool(stream) and (
+            (
+                self.compiled is not None and
+                isinstance(self.compiled.statement, expression.Selectable)
+            ) or (
+                (self.compiled is None or isinstance(
+                    self.compiled.statement, expression.TextClause)) and
+                self.statement is not None and
+                SERVER_SIDE_CURSOR_RE.match(self.statement) is not None
+            )
+        )
+
     def create_cursor(self):
+        if self._use_server_side_cursor():
+            self._foundationdb_server_side = True
+            args = ("sqla_fdb_c_%s_%s" % (
+                        hex(id(self))[2:], hex(_server_side_id())[2:]), )
+        else:
+            args = ()
+
         nested = self.execution_options.get('foundationdb_nested', False) or (
                 not self.isddl and self.compiled and
                 self.compiled._foundationdb_nested
             )
-        return self._dbapi_connection.cursor(nested=nested)
+        if not self.dialect.supports_nested_cursors:
+            return self._dbapi_connection.cursor(*args)
+        return self._dbapi_connection.cursor(*args, nested=nested)
+
+    def get_result_proxy(self):
+        if self._foundationdb_server_side:
+            return ServerSideResultProxy(self)
+        return super(FDBPsycopg2ExecutionContext, self).get_result_proxy()
 
 
 class FDBPsycopg2Compiler(FDBCompiler):
@@ -35,6 +203,32 @@ class FDBPsycopg2Dialect(FDBDialect):
 
     supports_native_decimal = True
 
+    supports_server_side_cursors = True
+    """The DBAPI connection can DECLARE server side cursors."""
+
+    def __init__(self, prepared_statement_cache_size=0,
+                        server_side_cursors=False, **kwargs):
+        super(FDBPsycopg2Dialect, self).__init__(**kwargs)
+        self.server_side_cursors = server_side_cursors
+        self.prepared_statement_cache_size = \
+                                int(prepared_statement_cache_size)
+
+    def _prepared_statements(self, dbapi_connection):
+        """Return the prepared statement cache of a DBAPI connection,
+        or None if the connection can't hold one."""
+
+        try:
+            return dbapi_connection._foundationdb_prepared
+        except AttributeError:
+            prepared = _PreparedStatements(
+                            self.prepared_statement_cache_size or
+                            DEFAULT_PREPARED_STATEMENT_CACHE_SIZE)
+            try:
+                dbapi_connection._foundationdb_prepared = prepared
+            except AttributeError:
+                return None
+            return prepared
+
     @classmethod
     def dbapi(cls):
         import psycopg2
@@ -50,6 +244,11 @@ class FDBPsycopg2Dialect(FDBDialect):
                 extensions.register_type(extensions.UNICODE, conn)
             fns.append(setup_unicode_extension)
 
+        if self.isolation_level is not None:
+            def set_isolation_level(conn):
+                self.set_isolation_level(conn, self.isolation_level)
+            fns.append(set_isolation_level)
+
         if fns:
             def on_connect(conn):
                 for fn in fns:
@@ -58,6 +257,17 @@ class FDBPsycopg2Dialect(FDBDialect):
         else:
             return None
 
+    def initialize(self, connection):
+        super(FDBPsycopg2Dialect, self).initialize(connection)
+        self.supports_nested_cursors = \
+            self._get_nested_cursor_support(connection)
+
+    def _get_nested_cursor_support(self, connection):
+        # a connection made by a custom creator may not use the
+        # FoundationDB connection class
+        return isinstance(connection.connection.connection,
+                                fdb_psycopg2.Connection)
+
     def create_connect_args(self, url):
         opts = url.translate_connect_args(username='user')
         if 'port' in opts:
@@ -0,0 +1,70 @@
+"""Implement the FoundationDB dialect for asynchronous psycopg2 connections.
+
+Connections are made in psycopg2's asynchronous mode, where statements
+are sent without waiting for their results; they are run by the
+:mod:`sqlalchemy_foundationdb.asyncio` engine, which waits for results
+on the asyncio event loop.  This dialect compiles statements and
+processes results as the ``foundationdb+psycopg2`` dialect does, but
+can't run statements itself.
+
+"""
+from __future__ import absolute_import
+
+from sqlalchemy import exc
+
+from .psycopg2 import FDBPsycopg2Dialect
+
+
+def _no_sync_execution():
+    return exc.InvalidRequestError(
+        "The foundationdb+psycopg2async dialect can't execute statements "
+        "synchronously; use sqlalchemy_foundationdb.asyncio.create_engine() "
+        "to create an engine for it.")
+
+class FDBPsycopg2AsyncDialect(FDBPsycopg2Dialect):
+    driver = 'psycopg2async'
+
+    # psycopg2 doesn't provide named cursors in asynchronous mode
+    supports_server_side_cursors = False
+
+    def __init__(self, **kwargs):
+        super(FDBPsycopg2AsyncDialect, self).__init__(**kwargs)
+        for arg in ('prepared_statement_cache_size', 'server_side_cursors'):
+            if getattr(self, arg):
+                raise exc.ArgumentError(
+                    "%s is not supported by the "
+                    "foundationdb+psycopg2async dialect" % arg)
+
+    def _prepared_statements(self, dbapi_connection):
+        # PREPARE is issued in the midst of setting up the execution,
+        # which can't wait for it to complete
+        return None
+
+    def create_connect_args(self, url):
+        cargs, opts = super(FDBPsycopg2AsyncDialect, self).\
+                                    create_connect_args(url)
+        opts['async'] = True
+        return cargs, opts
+
+    def on_connect(self):
+        # the isolation level is set by the asyncio engine, which
+        # can wait for the statement to complete
+        if self.dbapi and self.use_native_unicode:
+            from psycopg2 import extensions
+            def on_connect(conn):
+                extensions.register_type(extensions.UNICODE, conn)
+            return on_connect
+        else:
+            return None
+
+    def _set_transaction_characteristics(self, dbapi_conn, characteristics):
+        raise _no_sync_execution()
+
+    def do_execute(self, cursor, statement, parameters, context=None):
+        raise _no_sync_execution()
+
+    def do_execute_no_params(self, cursor, statement, context=None):
+        raise _no_sync_execution()
+
+    def do_executemany(self, cursor, statement, parameters, context=None):
+        raise _no_sync_execution()
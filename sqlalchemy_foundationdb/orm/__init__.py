@@ -1,3 +1,8 @@
-from .query import orm_nested, nestedload, nestedload_all
+from .query import orm_nested, nestedload, nestedload_all, grouploaded, \
+            nestedload_groupings
+from .properties import aggregate_property
+from .flush import batch_flush
 
-__all__ = ['orm_nested', 'nestedload', 'nestedload_all']
\ No newline at end of file
+__all__ = ['orm_nested', 'nestedload', 'nestedload_all', 'grouploaded',
+                    'nestedload_groupings', 'aggregate_property',
+                    'batch_flush']
@@ -0,0 +1,271 @@
+from sqlalchemy import event, Table
+from sqlalchemy.schema import ColumnDefault, ForeignKeyConstraint
+from sqlalchemy.orm import attributes
+from sqlalchemy.orm.interfaces import ONETOMANY, MANYTOONE
+from sqlalchemy.sql.util import sort_tables
+from ..dialect.base import batch_insert
+from .. import compat
+
+def batch_flush(session, chunk_size=None, grouping=False):
+    """Enable batched INSERTs of new objects for the given
+    :class:`~sqlalchemy:sqlalchemy.orm.session.Session`.
+
+    Normally, the unit of work emits a separate INSERT for each new object
+    whose primary key is generated by the database, in order to receive
+    the new primary key value.  With this extension, such objects are
+    instead INSERTed at the start of each flush using
+    :func:`.batch_insert`, which sends up to ``chunk_size`` rows per
+    statement and receives their primary keys via RETURNING::
+
+        from sqlalchemy_foundationdb import orm
+
+        sess = Session(engine)
+        orm.batch_flush(sess)
+
+        sess.add_all([Customer(name="c%d" % i) for i in range(10000)])
+        sess.commit()
+
+    Objects are batched only where this doesn't change the outcome of
+    the flush; objects with pending relationship changes, or whose
+    mapper is part of an inheritance hierarchy, uses versioning or has
+    ``before_insert`` / ``after_insert`` listeners, are flushed normally.
+
+    The batched INSERTs are emitted within the session's transaction,
+    ahead of the flush, and are rolled back along with it should the
+    flush fail.  A session in ``autocommit=True`` mode has no such
+    transaction at that point, and is always flushed normally.
+
+    :param chunk_size: the most rows to send in a single INSERT; defaults
+     to the ``insert_batch_size`` argument of
+     :func:`~sqlalchemy:sqlalchemy.create_engine`.
+
+    :param grouping: if True, new objects related along grouping foreign
+     keys (see :ref:`core_ddl_grouping`) are batched as well, one level of
+     the table group at a time, with the foreign key values of each level
+     populated from the primary keys of the level above.  The rows of each
+     level are sent ordered by their group, so that the writes of a
+     group are contiguous.
+
+    .. seealso::
+
+        :ref:`orm_batch_flush`
+
+    """
+    event.listen(session, "before_flush", _BatchInsert(chunk_size, grouping))
+
+class _BatchInsert(object):
+    def __init__(self, chunk_size, grouping):
+        self.chunk_size = chunk_size
+        self.grouping = grouping
+
+    def __call__(self, session, flush_context, instances):
+        if instances is not None or session.transaction is None:
+            return
+
+        pending = sorted(
+                    (attributes.instance_state(obj) for obj in session.new),
+                    key=lambda state: state.insert_order)
+
+        by_mapper = {}
+        excluded = set()
+        for state in pending:
+            mapper = state.manager.mapper
+            if _mapper_batchable(mapper):
+                by_mapper.setdefault(mapper, []).append(state)
+            else:
+                excluded.add(mapper.local_table)
+
+        # for each new object, the primary keys of its new ancestors
+        # in the table group; rows are sent in this order.
+        group_keys = {}
+
+        # INSERT tables in dependency order; a table which depends on
+        # another that still has rows to be INSERTed by the flush itself
+        # must be left to the flush as well.  With grouping, the states
+        # of each table are checked only once the level above has been
+        # INSERTed, as their foreign keys are populated from it.
+        tables = sort_tables(set(m.local_table for m in by_mapper))
+        for table in tables:
+            for mapper, states in by_mapper.items():
+                if mapper.local_table is not table:
+                    continue
+                if any(fk.column.table in excluded
+                            for fk in table.foreign_keys):
+                    excluded.add(table)
+                    continue
+
+                batch = []
+                for state in states:
+                    if self._state_batchable(state, mapper, group_keys):
+                        batch.append(state)
+                    else:
+                        excluded.add(table)
+                if batch:
+                    if self.grouping:
+                        batch.sort(key=lambda state: group_keys.get(state, ()))
+                    self._insert(session, mapper, batch, group_keys)
+
+    def _state_batchable(self, state, mapper, group_keys):
+        dict_ = state.dict
+        table = mapper.local_table
+        columntoproperty = mapper._columntoproperty
+
+        if dict_.get(columntoproperty[table._autoincrement_column].key) \
+                is not None:
+            return False
+
+        for prop in mapper.relationships:
+            history = attributes.get_state_history(
+                        state, prop.key, attributes.PASSIVE_NO_INITIALIZE)
+            if not history.has_changes():
+                continue
+            elif not self.grouping or not _is_grouping(prop):
+                return False
+            elif prop.direction is ONETOMANY:
+                # children are populated after this object is INSERTed;
+                # only new children can be handled that way.
+                for child in history.added:
+                    if child is not None and \
+                            attributes.instance_state(child).key is not None:
+                        return False
+            elif history.added and history.added[0] is not None:
+                # the parent must have been INSERTed already.
+                parent_state = attributes.instance_state(history.added[0])
+                if parent_state.key is None:
+                    return False
+                _sync_grouping_fk(prop, parent_state, state, group_keys)
+
+        # non-nullable foreign keys must be present already; nullable ones
+        # may be populated later by the flush, using an UPDATE.
+        for fk in table.foreign_keys:
+            col = fk.parent
+            if not col.nullable and col in columntoproperty and \
+                    dict_.get(columntoproperty[col].key) is None:
+                return False
+
+        return True
+
+    def _insert(self, session, mapper, states, group_keys):
+        table = mapper.local_table
+        pk_col = table._autoincrement_column
+        pk_key = mapper._columntoproperty[pk_col].key
+
+        params = [_insert_params(state, mapper, table) for state in states]
+        batch_insert(session.connection(mapper=mapper), table,
+                            params, self.chunk_size)
+
+        for state, state_params in zip(states, params):
+            state.dict[pk_key] = state_params[pk_col.key]
+
+        if self.grouping:
+            # populate the foreign keys of the next level down before
+            # this level's relationship changes are committed.
+            for prop in mapper.relationships:
+                if prop.direction is not ONETOMANY or not _is_grouping(prop):
+                    continue
+                for state in states:
+                    history = attributes.get_state_history(
+                            state, prop.key, attributes.PASSIVE_NO_INITIALIZE)
+                    for child in history.added:
+                        if child is not None:
+                            _sync_grouping_fk(
+                                    prop, state,
+                                    attributes.instance_state(child),
+                                    group_keys)
+
+        _register_persistent(session, states)
+
+        # columns generated server side are loaded on next access,
+        # as with a normal flush
+        for state, state_params in zip(states, params):
+            expire = [mapper._columntoproperty[col].key
+                        for col in table.c
+                        if col.key not in state_params and
+                        col in mapper._columntoproperty]
+            if expire:
+                state._expire_attributes(state.dict, expire)
+
+def _register_persistent(session, states):
+    """Move newly INSERTed states from pending to persistent, as the
+    unit of work does at the end of a flush."""
+
+    if compat.sqla_12:
+        session._register_persistent(states)
+    else:
+        session._register_newly_persistent(states)
+
+def _is_grouping(prop):
+    """Return True if the given relationship() joins along a
+    grouping foreign key."""
+
+    if prop.direction is ONETOMANY:
+        table = prop.mapper.local_table
+        fk_cols = set(r for l, r in prop.local_remote_pairs)
+    elif prop.direction is MANYTOONE:
+        table = prop.parent.local_table
+        fk_cols = set(l for l, r in prop.local_remote_pairs)
+    else:
+        return False
+
+    for constraint in getattr(table, 'constraints', ()):
+        if isinstance(constraint, ForeignKeyConstraint) and \
+                constraint.dialect_options['foundationdb']['grouping'] and \
+                set(fk.parent for fk in constraint.elements) == fk_cols:
+            return True
+    return False
+
+def _sync_grouping_fk(prop, parent_state, child_state, group_keys):
+    """Populate the grouping foreign key of a new child object from
+    its parent."""
+
+    if prop.direction is ONETOMANY:
+        parent_mapper, child_mapper = prop.parent, prop.mapper
+        pairs = prop.local_remote_pairs
+    else:
+        parent_mapper, child_mapper = prop.mapper, prop.parent
+        pairs = [(r, l) for l, r in prop.local_remote_pairs]
+
+    values = []
+    for parent_col, child_col in pairs:
+        value = parent_mapper._get_state_attr_by_column(
+                            parent_state, parent_state.dict, parent_col)
+        child_mapper._set_state_attr_by_column(
+                            child_state, child_state.dict, child_col, value)
+        values.append(value)
+
+    group_keys[child_state] = group_keys.get(parent_state, ()) + tuple(values)
+
+def _mapper_batchable(mapper):
+    table = mapper.local_table
+    return isinstance(table, Table) and \
+        mapper.inherits is None and \
+        mapper.polymorphic_on is None and \
+        mapper.version_id_col is None and \
+        not mapper.dispatch.before_insert and \
+        not mapper.dispatch.after_insert and \
+        len(table.primary_key) == 1 and \
+        table._autoincrement_column is not None and \
+        not any(
+            isinstance(col.default, ColumnDefault) and col.default.is_callable
+            for col in table.c
+        )
+
+def _insert_params(state, mapper, table):
+    dict_ = state.dict
+    columntoproperty = mapper._columntoproperty
+    params = {}
+    for col in table.c:
+        if col is table._autoincrement_column or \
+                col not in columntoproperty:
+            continue
+        key = columntoproperty[col].key
+        value = dict_.get(key)
+        if value is None:
+            if isinstance(col.default, ColumnDefault) and \
+                    col.default.is_scalar:
+                params[col.key] = dict_[key] = col.default.arg
+            elif col.default is None and col.server_default is None:
+                params[col.key] = None
+        else:
+            params[col.key] = value
+    return params
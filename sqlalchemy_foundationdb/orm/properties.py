@@ -0,0 +1,55 @@
+from sqlalchemy import select, func
+from sqlalchemy.orm import column_property
+
+def aggregate_property(attr, expr=None, **kw):
+    """Produce a column-based property holding an aggregate of the rows
+    related to each object along a relationship.
+
+    The aggregate is selected as a subquery correlated to the parent row,
+    so that a single value per object is loaded along with its other
+    columns, rather than the related objects themselves::
+
+        from sqlalchemy import func
+        from sqlalchemy_foundationdb import orm
+
+        Customer.order_count = orm.aggregate_property(Customer.orders)
+        Order.item_total = orm.aggregate_property(
+                                Order.items,
+                                func.sum(Item.price * Item.quantity))
+
+    As with any other column, the aggregate is also selected within the
+    nested select of a :func:`.nestedload` of the class; above, loading
+    ``Customer.orders`` using nested loading includes the item total of
+    each order, without loading any items.
+
+    The property is added to a mapping already configured, by
+    assigning it to a declarative class, as above, or using
+    :meth:`~sqlalchemy:sqlalchemy.orm.mapper.Mapper.add_property`.
+
+    :param attr: the relationship attribute, e.g. ``Customer.orders``.
+
+    :param expr: the aggregate expression, in terms of the related
+     mapping's columns; defaults to ``func.count()``.  Note that
+     aggregates other than ``count()`` are NULL for an object without
+     related rows, unless wrapped in ``func.coalesce()``.
+
+    :param \\**kw: further arguments passed to
+     :func:`~sqlalchemy:sqlalchemy.orm.column_property`, such as
+     ``deferred=True``.
+
+    .. seealso::
+
+        :ref:`orm_aggregate_properties`
+
+    """
+    prop = attr.property
+
+    if expr is None:
+        expr = func.count()
+
+    target = [prop.target]
+    if prop.secondary is not None:
+        target.append(prop.secondary)
+
+    stmt = select([expr]).where(attr).correlate_except(*target)
+    return column_property(stmt.as_scalar(), **kw)
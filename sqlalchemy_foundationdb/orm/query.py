@@ -1,6 +1,128 @@
 from sqlalchemy.orm.strategy_options import loader_option, _UnboundLoad
-from ..dialect.base import NestedResult as _NestedResult, nested as _nested
+from sqlalchemy.orm.query import QueryContext
+from sqlalchemy.orm.interfaces import MapperOption, ONETOMANY, MANYTOONE
+from sqlalchemy.orm import loading, state as statelib, Mapper
+from sqlalchemy import util, inspect, event, exc as sa_exc
+from ..dialect.base import NestedResult as _NestedResult, nested as _nested, \
+            NestedResultProxy, _stream_batch_size
+from .. import compat
 from . import strategy
+from .flush import _is_grouping
+
+class _NestedInstances(object):
+    """Produce ORM results from the successive nested cursors of
+    one :class:`.orm_nested` column.
+
+    This is a version of :meth:`sqlalchemy:sqlalchemy.orm.query.Query.instances`
+    which sets up the ``QueryContext`` and the row processors for the
+    query's entities only once per execution, when the first nested
+    cursor is received, and then runs the rows of each nested cursor
+    through them.
+
+    """
+    process = None
+
+    def __init__(self, query):
+        self.query = query
+        self.context = context = QueryContext(query)
+        context.runid = loading._new_runid()
+
+        self.single_entity = single_entity = len(query._entities) == 1 and \
+            query._entities[0].supports_single_entity
+        self.custom_rows = not compat.sqla_10 and single_entity and \
+            query._entities[0].custom_rows
+
+        filter_fns = [ent.filter_fn for ent in query._entities]
+        if id not in filter_fns:
+            self.filter_fn = None
+        elif single_entity:
+            self.filter_fn = id
+        else:
+            def filter_fn(row):
+                return tuple(fn(x) for x, fn in zip(row, filter_fns))
+            self.filter_fn = filter_fn
+
+    def _setup_processors(self, cursor):
+        query, context = self.query, self.context
+        if compat.sqla_10:
+            # row processors here make use of getters against the
+            # result metadata, which is shared among all the nested
+            # cursors of this column.
+            process, labels = list(zip(*[
+                query_entity.row_processor(query, context, cursor)
+                for query_entity in query._entities
+            ]))
+            if self.single_entity:
+                proc = process[0]
+                def process_rows(fetch):
+                    return [proc(row) for row in fetch]
+            else:
+                keyed_tuple = util.lightweight_named_tuple('result', labels)
+                def process_rows(fetch):
+                    return [keyed_tuple([proc(row) for proc in process])
+                            for row in fetch]
+        else:
+            process, labels = list(zip(*[
+                query_entity.row_processor(query, context, self.custom_rows)
+                for query_entity in query._entities
+            ]))
+            if self.custom_rows:
+                proc = process[0]
+                def process_rows(fetch):
+                    rows = []
+                    for row in fetch:
+                        proc(row, rows)
+                    return rows
+            elif self.single_entity:
+                proc = process[0]
+                def process_rows(fetch):
+                    return [proc(row, None) for row in fetch]
+            else:
+                def process_rows(fetch):
+                    return [util.KeyedTuple(
+                                [proc(row, None) for proc in process],
+                                labels) for row in fetch]
+        self.process = process_rows
+
+    def __call__(self, cursor):
+        query, context = self.query, self.context
+        yield_per = query._yield_per
+        try:
+            if self.process is None:
+                self._setup_processors(cursor)
+
+            while True:
+                context.partials = {}
+                context.progress = {}
+
+                if yield_per:
+                    fetch = cursor.fetchmany(yield_per)
+                    if not fetch:
+                        break
+                else:
+                    fetch = cursor.fetchall()
+
+                rows = self.process(fetch)
+
+                if self.filter_fn is not None:
+                    rows = util.unique_list(rows, self.filter_fn)
+
+                if not compat.sqla_10:
+                    statelib.InstanceState._commit_all_states(
+                        list(context.progress.items()),
+                        query.session.identity_map
+                    )
+                    for state, (dict_, attrs) in context.partials.items():
+                        state._commit(dict_, attrs)
+
+                for row in rows:
+                    yield row
+
+                if not yield_per:
+                    break
+        except Exception as err:
+            cursor.close()
+            util.raise_from_cause(err)
 
 class ORMNestedResult(_NestedResult):
     hashable = False
@@ -8,14 +130,21 @@ class ORMNestedResult(_NestedResult):
     def __init__(self, query):
         self.query = query
 
-    def foundationdb_result_processor(self, gen_nested_context):
-        super_process = super(ORMNestedResult, self).\
-            foundationdb_result_processor(gen_nested_context)
-        def process(value):
-            cursor = super_process(value)
-            return list(
-                self.query.instances(cursor)
-            )
+    def foundationdb_result_processor(self, nested_context):
+        batch_size = _stream_batch_size(nested_context.execution_options)
+        if batch_size:
+            # in streaming mode, hand back the generator itself;
+            # yield_per() has it fetch from the nested cursor
+            # in batches rather than calling fetchall().
+            instances = _NestedInstances(self.query.yield_per(batch_size))
+            def process(value):
+                return instances(NestedResultProxy(nested_context, value))
+        else:
+            instances = _NestedInstances(self.query)
+            def process(value):
+                return list(
+                    instances(NestedResultProxy(nested_context, value))
+                )
         return process
 
 class orm_nested(_nested):
@@ -35,6 +164,9 @@ class orm_nested(_nested):
             print "customer:", customer.name
             print "orders:", orders
 
+    When the ``foundationdb_stream_nested`` execution option is set,
+    the nested value is a generator of results rather than a list;
+    see :ref:`core_nested_streaming`.
 
     .. seealso::
 
@@ -49,7 +181,7 @@ class orm_nested(_nested):
 
 
 @loader_option()
-def nestedload(loadopt, attr):
+def nestedload(loadopt, attr, order_by=None, limit=None):
     """Indicate that the given attribute should be loaded using "nested"
     loading.
 
@@ -63,6 +195,19 @@ def nestedload(loadopt, attr):
             print "customer:", customer.name
             print "orders:", customer.orders
 
+    :param order_by: a column or list of columns by which to order the
+     related rows of each parent, in place of the relationship's own
+     ``order_by``.
+
+    :param limit: the largest number of related rows to load for each
+     parent; usually combined with ``order_by``, e.g. to load the
+     latest five orders of each customer::
+
+        orm.nestedload(Customer.orders, order_by=Order.id.desc(), limit=5)
+
+     A collection loaded with a limit contains only those rows; it
+     isn't reloaded to contain the remainder.
+
     .. seealso::
 
         :ref:`orm_nested_eager_loading`
@@ -72,14 +217,19 @@ def nestedload(loadopt, attr):
 
     """
 
-    return loadopt.set_relationship_strategy(attr, {"lazy": "nested"})
+    loader = loadopt.set_relationship_strategy(attr, {"lazy": "nested"})
+    if order_by is not None:
+        loader.local_opts['order_by'] = order_by
+    if limit is not None:
+        loader.local_opts['limit'] = limit
+    return loader
 
 @nestedload._add_unbound_fn
-def nestedload(*keys):
-    return _UnboundLoad._from_keys(_UnboundLoad.nestedload, keys, False, {})
+def nestedload(*keys, **kw):
+    return _UnboundLoad._from_keys(_UnboundLoad.nestedload, keys, False, kw)
 
 @nestedload._add_unbound_all_fn
-def nestedload_all(*keys):
+def nestedload_all(*keys, **kw):
     """Multiple-attribute form of :func:`.nestedload`.
 
     Note that the "all" style of loading is deprecated in SQLAlchemy.
@@ -92,6 +242,9 @@ def nestedload_all(*keys):
 
         sess.query(Customer).options(nestedload("orders").nestedload("items"))
 
+    The ``order_by`` and ``limit`` arguments of :func:`.nestedload` aren't
+    accepted, as they would apply to every level of the chain.
+
     .. seealso::
 
         :ref:`orm_nested_eager_loading`
@@ -99,7 +252,161 @@ def nestedload_all(*keys):
         :func:`.nestedload`
 
     """
+    if kw:
+        # each level of the chain would receive the same arguments
+        raise sa_exc.ArgumentError(
+                "nestedload_all() doesn't accept %s; use a chain of "
+                "nestedload() calls, passing them to the last one" %
+                ", ".join(sorted(kw)))
     return _UnboundLoad._from_keys(_UnboundLoad.nestedload, keys, True, {})
 
 nestedload = nestedload._unbound_fn
 nestedload_all = nestedload_all._unbound_all_fn
+
+
+class _GroupLoad(MapperOption):
+    """The :func:`.nestedload` options produced by :func:`.grouploaded`,
+    applied as one option."""
+
+    propagate_to_loaders = True
+
+    def __init__(self, options):
+        self.options = options
+
+    def process_query(self, query):
+        for opt in self.options:
+            opt.process_query(query)
+
+    def process_query_conditionally(self, query):
+        for opt in self.options:
+            opt.process_query_conditionally(query)
+
+def grouploaded(entity, depth=None):
+    """Indicate that the table group below the given entity should be
+    loaded using "nested" loading.
+
+    The one-to-many relationships of the entity's mapper which join
+    along grouping foreign keys are loaded using :func:`.nestedload`, as
+    are those of the related mappers in turn, so that the entity's
+    rows are returned along with the whole of their groups in a single
+    statement::
+
+        # same as nestedload(Customer.orders).nestedload(Order.items)
+        for customer in sess.query(Customer).options(
+                                    orm.grouploaded(Customer)):
+            print "customer:", customer.name
+            print "orders:", customer.orders
+
+    :param entity: the mapped class at the root of the group, as it
+     appears in the query.
+
+    :param depth: the number of levels of relationships to load; by
+     default, the whole group below the entity is loaded.
+
+    .. seealso::
+
+        :ref:`orm_group_loading`
+
+    """
+    if depth is not None and depth < 1:
+        raise sa_exc.ArgumentError("depth must be at least 1")
+
+    options = []
+
+    def walk(mapper, path, seen):
+        if depth is None or len(path) < depth:
+            children = [
+                prop for prop in mapper.relationships
+                if prop.direction is ONETOMANY and
+                prop.mapper not in seen and _is_grouping(prop)
+            ]
+        else:
+            children = []
+
+        if not children:
+            if path:
+                options.append(_nestedload_path(path))
+            return
+        for prop in children:
+            walk(prop.mapper, path + [prop], seen.union([prop.mapper]))
+
+    mapper = inspect(entity).mapper
+    walk(mapper, [], set([mapper]))
+    return _GroupLoad(options)
+
+def _nestedload_path(path):
+    """Return a :func:`.nestedload` chain along the given
+    relationships."""
+
+    opt = None
+    for prop in path:
+        attr = getattr(prop.parent.class_, prop.key)
+        if opt is None:
+            opt = nestedload(attr)
+        else:
+            opt = opt.nestedload(attr)
+    return opt
+
+def nestedload_groupings(target=Mapper, many_to_one=False):
+    """Have the relationships along grouping foreign keys use "nested"
+    loading by default.
+
+    Each one-to-many relationship of the given mappings which joins
+    along a grouping foreign key, and which is configured for the default
+    lazy loading, is configured as though ``lazy="nested"`` were given::
+
+        from sqlalchemy.ext.declarative import declarative_base
+        from sqlalchemy_foundationdb import orm
+
+        Base = declarative_base()
+        orm.nestedload_groupings(Base)
+
+    This should be called before the mappings are configured, which
+    normally happens when they are first used.  The depth of loading is
+    bounded as for ``lazy="nested"``: a mapper already loaded along the
+    path isn't loaded again, unless the relationship has a ``join_depth``.
+    A relationship may be left out using ``info={"foundationdb_nested":
+    False}``.
+
+    :param target: a mapped class or declarative base, whose mappings,
+     including those of subclasses, are configured; by default, all
+     mappings are.
+
+    :param many_to_one: also configure the many-to-one relationships
+     from a child to its parent in the group.
+
+    .. seealso::
+
+        :ref:`orm_group_loading`
+
+    """
+    directions = (ONETOMANY, MANYTOONE) if many_to_one else (ONETOMANY, )
+
+    def configure(mapper, class_):
+        for prop in mapper.relationships:
+            if prop.parent is mapper and \
+                    prop.lazy in (True, "select") and \
+                    prop.direction in directions and \
+                    prop.info.get("foundationdb_nested", True) and \
+                    _is_grouping(prop):
+                _set_nested_strategy(prop)
+
+    if isinstance(target, type) and not issubclass(target, Mapper):
+        event.listen(target, "mapper_configured", configure, propagate=True)
+        mapper = inspect(target, raiseerr=False)
+        if mapper is not None and mapper.configured:
+            for m in mapper.self_and_descendants:
+                configure(m, m.class_)
+    else:
+        event.listen(target, "mapper_configured", configure)
+
+def _set_nested_strategy(prop):
+    """Switch an initialized relationship() to the nested loader."""
+
+    prop.lazy = "nested"
+    if compat.sqla_10:
+        prop.strategy_key = (("lazy", "nested"), )
+        prop.strategy = prop._get_strategy(prop.strategy_key)
+    else:
+        prop.strategy_class = strategy.NestedLoader
+        prop.strategy = prop._get_strategy_by_cls(strategy.NestedLoader)
@@ -5,12 +5,24 @@ from sqlalchemy.orm import attributes
 from sqlalchemy.orm import loading
 from sqlalchemy import util
 from sqlalchemy import log
-from sqlalchemy import select
+from sqlalchemy import select, and_
 from sqlalchemy import exc as sa_exc
+from sqlalchemy.sql import expression
 from .. import nested
 
 @properties.RelationshipProperty.strategy_for(lazy="nested")
 class NestedLoader(AbstractRelationshipLoader):
+    """Load a relationship from a nested result column of the parent's
+    own row.
+
+    As each parent row carries its complete collection, the loader
+    holds no state from one row to the next, and so is compatible with
+    :meth:`sqlalchemy:sqlalchemy.orm.query.Query.yield_per`; parent
+    objects are released once their batch has been consumed, and
+    related objects which recur in later batches are located in the
+    identity map as usual.
+
+    """
     def __init__(self, parent):
         super(NestedLoader, self).__init__(parent)
         self.join_depth = self.parent_property.join_depth
@@ -86,8 +98,56 @@ class NestedLoader(AbstractRelationshipLoader):
         # restore context.secondary_columns collection
         context.secondary_columns = secondary_columns
 
+        # columns left out by load_only() / defer() aren't selected; the
+        # identity and discriminator columns are still needed to process
+        # each nested row, however the options have been given.
+        required = list(self.mapper.primary_key)
+        if self.mapper.polymorphic_on is not None:
+            required.append(self.mapper.polymorphic_on)
+        present = util.column_set(add_to_collection)
+        add_to_collection.extend(
+                    col for col in required if col not in present)
+
+        # a many-to-many joins the secondary table within the nested
+        # select; it isn't present in the enclosing one, so it stays
+        # in the nested FROM list while the parent is correlated.
+        if secondary is not None:
+            criterion = and_(pj, sj)
+        else:
+            criterion = pj
+
+        # select from the target's polymorphic selectable, so that
+        # joined inheritance subclass tables are joined rather than
+        # added to the FROM list individually
+        poly_selectable = self.mapper._with_polymorphic_args(
+                                        with_polymorphic)[1]
+
+        nested_select = select(add_to_collection).\
+                            select_from(poly_selectable).\
+                            where(criterion)
+
+        # joined inheritance tables share primary key column names;
+        # label the columns so that they're distinct in the nested result
+        if isinstance(poly_selectable, expression.Join):
+            nested_select = nested_select.apply_labels()
+
+        # ordering and limiting apply to each parent's rows, as the
+        # nested select is correlated to the parent row
+        if loadopt is not None:
+            order_by = loadopt.local_opts.get('order_by')
+            limit = loadopt.local_opts.get('limit')
+        else:
+            order_by = limit = None
+        if order_by is None:
+            # the relationship's own order_by is False when not set
+            order_by = self.parent_property.order_by
+        if order_by is not None and order_by is not False:
+            nested_select = nested_select.order_by(*util.to_list(order_by))
+        if limit is not None:
+            nested_select = nested_select.limit(limit)
+
         # produce Akiban nested select
-        our_col = nested(select(add_to_collection).where(pj).as_scalar())
+        our_col = nested(nested_select.as_scalar())
 
         # store it
         path.set(context.attributes, "nested_result", our_col)
@@ -131,9 +191,11 @@ class NestedLoader(AbstractRelationshipLoader):
         def load_collection_from_nested_new_row(state, dict_, row):
             collection = attributes.init_state_collection(
                                             state, dict_, key)
+            # unlike the joined loader, the collection isn't recorded in
+            # context.attributes; no later row adds to it, and under
+            # yield_per() that would hold on to every parent loaded.
             result_list = util.UniqueAppender(collection,
                                               'append_without_event')
-            context.attributes[(state, key)] = result_list
             for nested_row in row[our_col]:
                 _instance(nested_row, result_list)
 
@@ -0,0 +1,231 @@
+"""Retry units of work which fail on FoundationDB transaction conflicts.
+
+"""
+import functools
+import random
+import threading
+import time
+
+from sqlalchemy import exc
+from sqlalchemy.engine import Engine, Connection
+from sqlalchemy.orm import Session
+
+
+class RetryMetrics(object):
+    """Counts of the attempts made by a :class:`.retry`.
+
+    The counts are kept for all units of work run through the
+    :class:`.retry` objects sharing this :class:`.RetryMetrics`, and
+    may be read at any time, for example by a metrics exporter.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Reset all counts to zero."""
+
+        with self._lock:
+            self.attempts = 0
+            """Number of attempts made to run a unit of work."""
+
+            self.conflicts = 0
+            """Number of attempts which failed with a retryable error."""
+
+            self.retries = 0
+            """Number of attempts which were followed by another attempt."""
+
+            self.failures = 0
+            """Number of units of work given up on after the final attempt
+            failed with a retryable error."""
+
+            self.sqlstates = {}
+            """Number of retryable errors, keyed on SQLSTATE."""
+
+    def _record(self, attempt=False, conflict=None, retry=False,
+                                                    failure=False):
+        with self._lock:
+            if attempt:
+                self.attempts += 1
+            if conflict is not None:
+                self.conflicts += 1
+                self.sqlstates[conflict] = self.sqlstates.get(conflict, 0) + 1
+            if retry:
+                self.retries += 1
+            if failure:
+                self.failures += 1
+
+
+class retry(object):
+    """Run a unit of work in a transaction, running it again if the
+    transaction is aborted by a FoundationDB conflict.
+
+    FoundationDB transactions are optimistic; a transaction which
+    conflicts with a concurrent one, or which runs for longer than the
+    maximum transaction age, fails, usually at COMMIT, and must be run
+    again from the start.  :class:`.retry` recognizes these errors using
+    the ``retryable_sqlstates`` of the dialect, and runs the unit of work
+    in a new transaction, up to ``attempts`` times in all, sleeping for a
+    randomized, exponentially increasing interval between attempts.
+
+    The unit of work may be given as a function, which receives the
+    :class:`~sqlalchemy:sqlalchemy.engine.Connection` or
+    :class:`~sqlalchemy:sqlalchemy.orm.session.Session` to work with as
+    its first argument::
+
+        from sqlalchemy_foundationdb import retry
+
+        @retry(engine)
+        def transfer(conn, from_id, to_id, amount):
+            conn.execute(...)
+
+        transfer(1, 2, 100)
+
+    Or inline, by iterating through attempts, each of which is a context
+    manager::
+
+        for attempt in retry(session):
+            with attempt as session:
+                session.add(...)
+
+    :param bind: an :class:`~sqlalchemy:sqlalchemy.engine.Engine`, from
+     which a new connection is acquired for each attempt; a
+     :class:`~sqlalchemy:sqlalchemy.engine.Connection` not already in a
+     transaction; or a :class:`~sqlalchemy:sqlalchemy.orm.session.Session`,
+     which is committed at the end of each attempt and rolled back when
+     an attempt fails.
+
+    :param attempts: the most times to run the unit of work.
+
+    :param backoff: the longest sleep, in seconds, after the first
+     failed attempt; the limit doubles with each further attempt, and
+     the actual sleep is chosen at random up to the limit.
+
+    :param max_backoff: the longest sleep, in seconds, after any attempt.
+
+    :param metrics: a :class:`.RetryMetrics` in which to count attempts;
+     by default, each :class:`.retry` has its own, available as its
+     ``metrics`` attribute.
+
+    .. seealso::
+
+        :ref:`core_retry`
+
+    """
+
+    def __init__(self, bind, attempts=5, backoff=.01, max_backoff=1.,
+                                                        metrics=None):
+        if attempts < 1:
+            raise exc.ArgumentError("attempts must be at least 1")
+        if isinstance(bind, Connection) and bind.in_transaction():
+            raise exc.InvalidRequestError(
+                "Can't retry a unit of work within a transaction that "
+                "is already in progress")
+        self.bind = bind
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.metrics = metrics if metrics is not None else RetryMetrics()
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def go(*arg, **kw):
+            return self.run(fn, *arg, **kw)
+        return go
+
+    def run(self, fn, *arg, **kw):
+        """Run the given function as the unit of work, passing it the
+        connection or session, followed by the given arguments, and
+        return its result."""
+
+        for attempt in self:
+            with attempt as target:
+                result = fn(target, *arg, **kw)
+        return result
+
+    def __iter__(self):
+        for number in range(1, self.attempts + 1):
+            attempt = _Attempt(self, number)
+            yield attempt
+            if attempt.error is None:
+                return
+            self.metrics._record(retry=True)
+            time.sleep(self._backoff_interval(number))
+
+    def _backoff_interval(self, number):
+        return random.uniform(
+                0, min(self.max_backoff, self.backoff * 2 ** (number - 1)))
+
+    def _dialect(self):
+        if isinstance(self.bind, Session):
+            return self.bind.get_bind().dialect
+        else:
+            return self.bind.dialect
+
+class _Attempt(object):
+    """One attempt at running a unit of work, as a context manager."""
+
+    error = None
+
+    def __init__(self, retry, number):
+        self.retry = retry
+        self.number = number
+        self.last = number == retry.attempts
+
+    def __enter__(self):
+        self.retry.metrics._record(attempt=True)
+        bind = self.retry.bind
+        if isinstance(bind, Session):
+            self.connection = self.transaction = None
+            return bind
+        elif isinstance(bind, Engine):
+            self.connection = bind.connect()
+        else:
+            self.connection = bind
+        self.transaction = self.connection.begin()
+        return self.connection
+
+    def __exit__(self, type_, value, traceback):
+        try:
+            if type_ is None:
+                try:
+                    self._commit()
+                except exc.DBAPIError as err:
+                    self._rollback()
+                    if not self._failed(err):
+                        raise
+                    return True
+            else:
+                self._rollback()
+                if isinstance(value, exc.DBAPIError):
+                    return self._failed(value)
+        finally:
+            if self.connection is not None and \
+                    self.connection is not self.retry.bind:
+                self.connection.close()
+
+    def _commit(self):
+        if self.transaction is not None:
+            self.transaction.commit()
+        else:
+            self.retry.bind.commit()
+
+    def _rollback(self):
+        if self.transaction is not None:
+            if self.transaction.is_active:
+                self.transaction.rollback()
+        else:
+            self.retry.bind.rollback()
+
+    def _failed(self, error):
+        dialect = self.retry._dialect()
+        if dialect.is_retryable(error):
+            self.retry.metrics._record(
+                conflict=dialect._error_sqlstate(error.orig),
+                failure=self.last)
+            if not self.last:
+                self.error = error
+                return True
+        return False
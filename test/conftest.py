@@ -1,6 +1,15 @@
+import sys
+
 from sqlalchemy.dialects import registry
 
 registry.register("foundationdb", "sqlalchemy_foundationdb.dialect.psycopg2", "FDBPsycopg2Dialect")
 registry.register("foundationdb.psycopg2", "sqlalchemy_foundationdb.dialect.psycopg2", "FDBPsycopg2Dialect")
+registry.register("foundationdb.psycopg2async", "sqlalchemy_foundationdb.dialect.psycopg2async", "FDBPsycopg2AsyncDialect")
 
 from sqlalchemy.testing.plugin.pytestplugin import *
+
+# the asyncio extension uses async / await syntax and
+# loop.create_future(), new in Python 3.5.2
+collect_ignore = []
+if sys.version_info < (3, 5, 2):
+    collect_ignore.append("test_asyncio.py")
@@ -0,0 +1,111 @@
+from sqlalchemy.testing import fixtures
+from sqlalchemy.testing.assertions import eq_, AssertsCompiledSQL, \
+                AssertsExecutionResults
+from sqlalchemy import func
+from sqlalchemy.orm import relationship, Session, mapper, class_mapper
+from .fixtures import cust_order_item, cust_order_data
+from decimal import Decimal
+from sqlalchemy_foundationdb import orm
+
+class AggregatePropertyTest(fixtures.MappedTest, AssertsCompiledSQL,
+                                AssertsExecutionResults):
+    __dialect__ = 'foundationdb'
+
+    run_inserts = 'once'
+    run_deletes = None
+
+    @classmethod
+    def define_tables(cls, metadata):
+        cust_order_item(metadata)
+
+    @classmethod
+    def insert_data(cls):
+        cust_order_data(cls)
+
+    @classmethod
+    def setup_classes(cls):
+        class Customer(cls.Comparable):
+            pass
+        class Order(cls.Comparable):
+            pass
+        class Item(cls.Comparable):
+            pass
+
+    @classmethod
+    def setup_mappers(cls):
+        Customer, Order, Item = cls.classes.Customer, \
+                                    cls.classes.Order, \
+                                    cls.classes.Item
+        customer, order, item = cls.tables.customer,\
+                                    cls.tables.order,\
+                                    cls.tables.item
+        mapper(Customer, customer, properties={
+            'orders': relationship(Order, order_by=order.c.id)
+        })
+        mapper(Order, order, properties={
+            'items': relationship(Item)
+        })
+        mapper(Item, item)
+
+        class_mapper(Customer).add_property('order_count',
+                    orm.aggregate_property(Customer.orders))
+        class_mapper(Order).add_property('item_total',
+                    orm.aggregate_property(Order.items,
+                                func.sum(item.c.price * item.c.quantity)))
+
+    def test_render(self):
+        Customer = self.classes.Customer
+        s = Session()
+        self.assert_compile(
+                s.query(Customer),
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT count(*) AS '
+                'count_1 FROM "order" WHERE customer.id = '
+                '"order".customer_id) AS anon_1 FROM customer'
+        )
+
+    def test_render_nested(self):
+        Customer = self.classes.Customer
+        s = Session()
+        q = s.query(Customer).options(orm.nestedload(Customer.orders))
+        self.assert_compile(
+                q,
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT count(*) AS '
+                'count_1 FROM "order" WHERE customer.id = '
+                '"order".customer_id) AS anon_1, (SELECT "order".id, '
+                '"order".customer_id, "order".order_info, (SELECT '
+                'sum(item.price * item.quantity) AS sum_1 FROM item '
+                'WHERE "order".id = item.order_id) AS anon_3 FROM "order" '
+                'WHERE customer.id = "order".customer_id '
+                'ORDER BY "order".id) AS anon_2 FROM customer'
+        )
+
+    def test_load(self):
+        Customer = self.classes.Customer
+        s = Session()
+        q = s.query(Customer).filter(Customer.id.in_([1, 2, 10])).\
+                                    order_by(Customer.id)
+
+        with self.assert_statement_count(1):
+            eq_(
+                [(c.id, c.order_count) for c in q],
+                [(1, 3), (2, 3), (10, 0)]
+            )
+
+    def test_load_nested(self):
+        Customer = self.classes.Customer
+        s = Session()
+        q = s.query(Customer).options(orm.nestedload(Customer.orders)).\
+                                    filter(Customer.id == 1)
+
+        with self.assert_statement_count(1):
+            customer = q.one()
+            eq_(customer.order_count, 3)
+            eq_(
+                [(o.id, o.item_total) for o in customer.orders],
+                [(101, Decimal("49.97")), (102, Decimal("9.99")),
+                    (103, Decimal("9.99"))]
+            )
+            for o in customer.orders:
+                assert 'items' not in o.__dict__
@@ -0,0 +1,237 @@
+import asyncio
+import copy
+import socket
+
+from sqlalchemy.testing import fixtures, config, mock
+from sqlalchemy.testing.assertions import eq_, assert_raises
+from sqlalchemy import exc, select, func
+from sqlalchemy.engine import url
+from sqlalchemy.orm import relationship, Session, mapper
+from psycopg2 import extensions
+from .fixtures import cust_order_item, cust_order_data
+from sqlalchemy_foundationdb import nested, orm
+from sqlalchemy_foundationdb.asyncio import create_engine, _poll
+from sqlalchemy_foundationdb.dialect.psycopg2async import \
+            FDBPsycopg2AsyncDialect
+
+
+def _run(coro):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+class AsyncDialectTest(fixtures.TestBase):
+    def test_connect_args(self):
+        dialect = FDBPsycopg2AsyncDialect()
+        cargs, opts = dialect.create_connect_args(
+                url.make_url("foundationdb+psycopg2async://@localhost:15432/"))
+        eq_(opts['async'], True)
+        eq_(opts['port'], 15432)
+
+    def test_no_sync_execution(self):
+        dialect = FDBPsycopg2AsyncDialect()
+        cursor = mock.Mock()
+        assert_raises(
+            exc.InvalidRequestError,
+            dialect.do_execute, cursor, "select 1", {}
+        )
+        assert_raises(
+            exc.InvalidRequestError,
+            dialect.do_executemany, cursor, "select 1", [{}, {}]
+        )
+        assert_raises(
+            exc.InvalidRequestError,
+            dialect.set_isolation_level, mock.Mock(), "SNAPSHOT"
+        )
+        eq_(cursor.mock_calls, [])
+
+    def test_no_prepared_statements(self):
+        assert_raises(
+            exc.ArgumentError,
+            FDBPsycopg2AsyncDialect, prepared_statement_cache_size=10
+        )
+
+    def test_create_engine_requires_async_dialect(self):
+        assert_raises(
+            exc.ArgumentError,
+            create_engine, "foundationdb+psycopg2://@localhost:15432/"
+        )
+
+    def test_create_engine_invalid_argument(self):
+        assert_raises(
+            TypeError,
+            create_engine, "foundationdb+psycopg2async://@localhost:15432/",
+            pool_timeout=5
+        )
+
+
+class PollTest(fixtures.TestBase):
+    def setup(self):
+        self.sock, self.peer = socket.socketpair()
+
+    def teardown(self):
+        self.sock.close()
+        self.peer.close()
+
+    def _conn(self, *states):
+        conn = mock.Mock()
+        conn.fileno.return_value = self.sock.fileno()
+        conn.poll.side_effect = list(states)
+        return conn
+
+    def test_poll_ready(self):
+        conn = self._conn(extensions.POLL_OK)
+        _run(_poll(conn))
+        eq_(conn.poll.call_count, 1)
+        eq_(conn.fileno.call_count, 0)
+
+    def test_poll_write_read(self):
+        conn = self._conn(extensions.POLL_WRITE, extensions.POLL_READ,
+                                                    extensions.POLL_OK)
+        self.peer.send(b"x")
+        _run(_poll(conn))
+        eq_(conn.poll.call_count, 3)
+
+    def test_poll_error(self):
+        conn = self._conn()
+        conn.poll.side_effect = extensions.QueryCanceledError("canceled")
+        assert_raises(extensions.QueryCanceledError, _run, _poll(conn))
+
+
+class AsyncExecutionTest(fixtures.MappedTest):
+    __only_on__ = 'foundationdb'
+
+    run_inserts = 'once'
+    run_deletes = None
+
+    @classmethod
+    def define_tables(cls, metadata):
+        cust_order_item(metadata)
+
+    @classmethod
+    def insert_data(cls):
+        cust_order_data(cls)
+
+    @classmethod
+    def setup_classes(cls):
+        class Customer(cls.Comparable):
+            pass
+        class Order(cls.Comparable):
+            pass
+
+    @classmethod
+    def setup_mappers(cls):
+        Customer, Order = cls.classes.Customer, cls.classes.Order
+        mapper(Customer, cls.tables.customer, properties={
+            'orders': relationship(Order)
+        })
+        mapper(Order, cls.tables.order)
+
+    def _engine(self, **kw):
+        async_url = copy.copy(config.db.url)
+        async_url.drivername = "foundationdb+psycopg2async"
+        return create_engine(async_url, **kw)
+
+    def test_execute(self):
+        customer = self.tables.customer
+        engine = self._engine()
+
+        async def go():
+            async with engine.connect() as conn:
+                result = await conn.execute(
+                    select([customer.c.name]).where(customer.c.id == 1))
+                return result.fetchall()
+        eq_(_run(go()), [('David McFarlane', )])
+        engine.dispose()
+
+    def test_nested(self):
+        customer, order = self.tables.customer, self.tables.order
+        engine = self._engine()
+
+        async def go():
+            async with engine.connect() as conn:
+                n = nested(
+                        select([order.c.id]).
+                        where(order.c.customer_id == customer.c.id).
+                        order_by(order.c.id)
+                    ).label('orders')
+                result = await conn.execute(
+                    select([customer.c.id, n]).where(customer.c.id == 1))
+                return [(row.id, row.orders.fetchall()) for row in result]
+
+        eq_(_run(go()), [(1, [(101, ), (102, ), (103, )])])
+        engine.dispose()
+
+    def test_nestedload(self):
+        Customer, Order = self.classes.Customer, self.classes.Order
+        engine = self._engine()
+        sess = Session()
+
+        async def go():
+            async with engine.connect() as conn:
+                return await conn.query(
+                        sess.query(Customer).
+                        options(orm.nestedload(Customer.orders)).
+                        filter(Customer.id == 1))
+
+        customers = _run(go())
+        eq_(
+            customers,
+            [Customer(id=1, name='David McFarlane', orders=[
+                Order(id=101), Order(id=102), Order(id=103)])]
+        )
+        assert 'orders' in customers[0].__dict__
+        engine.dispose()
+
+    def test_concurrent(self):
+        customer = self.tables.customer
+        engine = self._engine(pool_size=2)
+
+        async def count(id_):
+            async with engine.connect() as conn:
+                return await conn.scalar(
+                    select([func.count(customer.c.id)]).
+                    where(customer.c.id <= id_))
+
+        async def go():
+            return await asyncio.gather(*[count(i) for i in range(1, 6)])
+
+        eq_(_run(go()), [1, 2, 3, 4, 5])
+        eq_(len(engine._pool._idle), 2)
+        engine.dispose()
+
+    def test_transaction_rollback(self):
+        item = self.tables.item
+        engine = self._engine(pool_size=1)
+
+        count = select([func.count(item.c.id)])
+
+        async def go():
+            async with engine.connect() as conn:
+                before = await conn.scalar(count)
+                try:
+                    async with conn.begin():
+                        await conn.execute(item.delete())
+                        eq_(await conn.scalar(count), 0)
+                        raise ValueError()
+                except ValueError:
+                    pass
+                assert not conn.in_transaction()
+                return before, await conn.scalar(count)
+
+        before, after = _run(go())
+        eq_(before, after)
+        engine.dispose()
+
+    def test_error(self):
+        engine = self._engine()
+
+        async def go():
+            async with engine.connect() as conn:
+                await conn.execute("select * from nonexistent")
+
+        assert_raises(exc.DBAPIError, _run, go())
+        engine.dispose()
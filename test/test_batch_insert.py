@@ -0,0 +1,263 @@
+from sqlalchemy.testing import fixtures, config
+from sqlalchemy.testing.assertions import eq_, AssertsCompiledSQL, \
+                AssertsExecutionResults, assert_raises, \
+                assert_raises_message
+from sqlalchemy.orm import relationship, Session, mapper
+from sqlalchemy import select, exc, MetaData, Table, Column, Integer
+from .fixtures import cust_order_item
+from sqlalchemy_foundationdb import batch_insert
+from sqlalchemy_foundationdb.dialect.base import _insert_chunks
+from sqlalchemy_foundationdb import orm
+
+
+class InsertChunksTest(fixtures.TestBase):
+    def test_chunk_size(self):
+        params = [{"x": i} for i in range(7)]
+        eq_(
+            [[p["x"] for p in chunk] for chunk in _insert_chunks(params, 3)],
+            [[0, 1, 2], [3, 4, 5], [6]]
+        )
+
+    def test_chunk_by_keys(self):
+        params = [{"x": 1}, {"x": 2}, {"x": 3, "y": 1}, {"x": 4}]
+        eq_(
+            [len(chunk) for chunk in _insert_chunks(params, 10)],
+            [2, 1, 1]
+        )
+
+    def test_no_primary_key(self):
+        t = Table('no_pk', MetaData(), Column('x', Integer))
+        assert_raises_message(
+            exc.ArgumentError,
+            "batch_insert\\(\\) requires a table with a primary key; "
+            "table 'no_pk' has none",
+            batch_insert, config.db, t, [{"x": 1}]
+        )
+
+
+class RenderTest(fixtures.TablesTest, AssertsCompiledSQL):
+    __dialect__ = 'foundationdb'
+
+    run_create_tables = None
+    run_deletes = None
+
+    @classmethod
+    def define_tables(cls, metadata):
+        cust_order_item(metadata)
+        metadata.bind = None
+
+    def test_multivalues_returning(self):
+        customer = self.tables.customer
+        self.assert_compile(
+            customer.insert().values(
+                    [{"name": "c1"}, {"name": "c2"}]).returning(customer.c.id),
+            "INSERT INTO customer (name) VALUES (%(name_0)s), (%(name_1)s) "
+            "RETURNING id"
+        )
+
+
+class BatchInsertTest(fixtures.TablesTest):
+    __only_on__ = 'foundationdb'
+
+    run_deletes = 'each'
+
+    @classmethod
+    def define_tables(cls, metadata):
+        cust_order_item(metadata)
+
+    def test_batch_insert(self):
+        customer = self.tables.customer
+
+        params = [{"name": "c%d" % i} for i in range(7)]
+        with config.db.connect() as conn:
+            pks = batch_insert(conn, customer, params, chunk_size=3)
+
+            eq_(len(set(pks)), 7)
+            eq_([(p["id"], ) for p in params], pks)
+            eq_(
+                conn.execute(
+                    select([customer.c.id, customer.c.name]).
+                        order_by(customer.c.id)).fetchall(),
+                sorted((p["id"], p["name"]) for p in params)
+            )
+
+
+class BatchFlushTest(fixtures.MappedTest, AssertsExecutionResults):
+    __only_on__ = 'foundationdb'
+
+    run_deletes = 'each'
+
+    @classmethod
+    def define_tables(cls, metadata):
+        cust_order_item(metadata)
+
+    @classmethod
+    def setup_classes(cls):
+        class Customer(cls.Comparable):
+            pass
+        class Order(cls.Comparable):
+            pass
+        class Item(cls.Comparable):
+            pass
+
+    @classmethod
+    def setup_mappers(cls):
+        Customer, Order, Item = cls.classes.Customer, \
+                    cls.classes.Order, cls.classes.Item
+        mapper(Customer, cls.tables.customer, properties={
+            'orders': relationship(Order, backref="customer")
+        })
+        mapper(Order, cls.tables.order, properties={
+            'items': relationship(Item, backref="order")
+        })
+        mapper(Item, cls.tables.item)
+
+    def test_batch_flush(self):
+        Customer = self.classes.Customer
+
+        s = Session()
+        orm.batch_flush(s, chunk_size=4)
+
+        customers = [Customer(name="c%d" % i) for i in range(10)]
+        s.add_all(customers)
+
+        # three INSERT statements
+        with self.assert_statement_count(3):
+            s.flush()
+
+        ids = [c.id for c in customers]
+        eq_(len(set(ids)), 10)
+        assert not s.new
+        s.expunge_all()
+        eq_(
+            [(c.id, c.name) for c in s.query(Customer).order_by(Customer.id)],
+            sorted((c.id, c.name) for c in customers)
+        )
+
+    def test_autocommit_flushes_normally(self):
+        Customer = self.classes.Customer
+
+        s = Session(autocommit=True)
+        orm.batch_flush(s, chunk_size=4)
+
+        s.add_all([Customer(name="c%d" % i) for i in range(10)])
+
+        # no transaction to batch within; one INSERT per object
+        with self.assert_statement_count(10):
+            s.flush()
+        assert not s.new
+
+    def test_rollback_with_flush(self):
+        Customer = self.classes.Customer
+
+        s = Session()
+        orm.batch_flush(s)
+
+        s.add(Customer(id=100000, name="c0"))
+        s.commit()
+
+        customers = [Customer(name="c%d" % i) for i in range(1, 5)]
+        s.add_all(customers)
+
+        # flushed normally, after the batch; fails on the primary key
+        s.add(Customer(id=100000, name="dupe"))
+        assert_raises(exc.IntegrityError, s.flush)
+
+        s.rollback()
+        for c in customers:
+            assert c not in s
+        eq_(s.query(Customer).count(), 1)
+
+    def test_relationships_flush_normally(self):
+        Customer, Order = self.classes.Customer, self.classes.Order
+
+        s = Session()
+        orm.batch_flush(s)
+
+        c1 = Customer(name="c1", orders=[Order(order_info="o1")])
+        c2 = Customer(name="c2")
+        s.add_all([c1, c2])
+        s.flush()
+        s.expunge_all()
+
+        eq_(
+            s.query(Customer).order_by(Customer.name).all(),
+            [
+                Customer(name="c1", orders=[Order(order_info="o1")]),
+                Customer(name="c2", orders=[])
+            ]
+        )
+
+    def test_grouping(self):
+        Customer, Order, Item = self.classes.Customer, \
+                    self.classes.Order, self.classes.Item
+
+        s = Session()
+        orm.batch_flush(s, grouping=True)
+
+        customers = [
+            Customer(name="c%d" % i, orders=[
+                Order(order_info="o%d%d" % (i, j),
+                    items=[Item(quantity=k) for k in range(2)])
+                for j in range(2)
+            ])
+            for i in range(3)
+        ]
+        s.add_all(customers)
+
+        # one INSERT each for customer, order and item
+        with self.assert_statement_count(3):
+            s.flush()
+        assert not s.new
+
+        s.expunge_all()
+        eq_(
+            s.query(Customer).order_by(Customer.name).all(),
+            [
+                Customer(name="c%d" % i, orders=[
+                    Order(order_info="o%d%d" % (i, j),
+                        items=[Item(quantity=k) for k in range(2)])
+                    for j in range(2)
+                ])
+                for i in range(3)
+            ]
+        )
+
+    def test_grouping_persistent_parent(self):
+        Customer, Order = self.classes.Customer, self.classes.Order
+
+        s = Session()
+        orm.batch_flush(s, grouping=True)
+
+        c1 = Customer(name="c1")
+        s.add(c1)
+        s.flush()
+
+        o1, o2 = Order(order_info="o1"), Order(order_info="o2")
+        c1.orders.extend([o1, o2])
+
+        # one INSERT for both orders
+        with self.assert_statement_count(1):
+            s.flush()
+        eq_([o1.customer_id, o2.customer_id], [c1.id, c1.id])
+
+    def test_grouping_ordered_by_parent(self):
+        Customer, Order = self.classes.Customer, self.classes.Order
+
+        s = Session()
+        orm.batch_flush(s, grouping=True)
+
+        c1, c2 = Customer(name="c1"), Customer(name="c2")
+        orders = [Order(order_info="o%d" % i) for i in range(4)]
+        s.add_all([c1, c2])
+        s.flush()
+
+        # added alternating between parents; INSERTed grouped by parent
+        for i, o in enumerate(orders):
+            (c1, c2)[i % 2].orders.append(o)
+        s.flush()
+
+        eq_(
+            [o.order_info for o in sorted(orders, key=lambda o: o.id)],
+            ["o0", "o2", "o1", "o3"]
+        )
@@ -0,0 +1,121 @@
+from sqlalchemy.testing import fixtures, config, mock
+from sqlalchemy.testing.assertions import eq_, assert_raises_message
+from sqlalchemy import exc, select, func
+from .fixtures import cust_order_item
+from sqlalchemy_foundationdb.dialect.base import FDBDialect, \
+            FDBExecutionContext
+
+
+class ChunkedExecuteManyTest(fixtures.TestBase):
+    def _context(self, in_transaction=False, **opts):
+        context = FDBExecutionContext.__new__(FDBExecutionContext)
+        context.dialect = FDBDialect(chunk_max_bytes=100)
+        context.execution_options = opts
+        context.root_connection = mock.Mock()
+        context.root_connection.in_transaction.return_value = in_transaction
+        context._dbapi_connection = mock.Mock()
+        context.progress = []
+        return context
+
+    def _cursor(self, context):
+        cursor = mock.Mock()
+
+        def executemany(statement, piece):
+            context.progress.append(("execute", len(piece)))
+            cursor.rowcount = len(piece)
+        cursor.executemany.side_effect = executemany
+        context._dbapi_connection.commit.side_effect = \
+            lambda: context.progress.append(("commit", ))
+        return cursor
+
+    def _params(self, count):
+        # 8 bytes each
+        return [{"x": "%08d" % i} for i in range(count)]
+
+    def test_byte_limit(self):
+        committed = []
+        context = self._context(
+            foundationdb_chunk_progress=lambda n, total:
+                            committed.append((n, total)))
+        cursor = self._cursor(context)
+
+        with mock.patch("sqlalchemy_foundationdb.dialect.base."
+                            "_CHUNK_PIECE_SIZE", 5):
+            context._chunked_executemany(cursor, "stmt", self._params(32))
+
+        eq_(
+            context.progress,
+            [
+                ("execute", 5), ("execute", 5), ("commit", ),
+                ("execute", 5), ("execute", 5), ("commit", ),
+                ("execute", 5), ("execute", 5), ("execute", 2),
+                ("commit", ),
+            ]
+        )
+        eq_(committed, [(10, 32), (20, 32), (32, 32)])
+        eq_(context.rowcount, 32)
+
+    def test_time_limit(self):
+        context = self._context(foundationdb_chunk_max_seconds=5)
+        cursor = self._cursor(context)
+
+        with mock.patch("sqlalchemy_foundationdb.dialect.base."
+                            "_CHUNK_PIECE_SIZE", 2), \
+                mock.patch("sqlalchemy_foundationdb.dialect.base.time.time",
+                            side_effect=[0, 3, 6, 6, 9]):
+            context._chunked_executemany(cursor, "stmt", self._params(6))
+
+        eq_(
+            context.progress,
+            [
+                ("execute", 2), ("execute", 2), ("commit", ),
+                ("execute", 2), ("commit", ),
+            ]
+        )
+
+    def test_resume(self):
+        context = self._context(foundationdb_chunk_resume=20)
+        cursor = self._cursor(context)
+
+        context._chunked_executemany(cursor, "stmt", self._params(32))
+        eq_(context.progress, [("execute", 12), ("commit", )])
+        eq_(context.rowcount, 12)
+
+    def test_in_transaction(self):
+        context = self._context(in_transaction=True)
+        assert_raises_message(
+            exc.InvalidRequestError,
+            "can't be used within a transaction",
+            context._chunked_executemany,
+            self._cursor(context), "stmt", self._params(5)
+        )
+
+
+class ChunkedInsertTest(fixtures.TablesTest):
+    __only_on__ = 'foundationdb'
+
+    run_deletes = 'each'
+
+    @classmethod
+    def define_tables(cls, metadata):
+        cust_order_item(metadata)
+
+    def test_chunked_insert(self):
+        customer = self.tables.customer
+        committed = []
+
+        with config.db.connect() as conn:
+            result = conn.execution_options(
+                    foundationdb_chunked=True,
+                    foundationdb_chunk_max_bytes=2000,
+                    foundationdb_chunk_progress=lambda n, total:
+                            committed.append(n)
+                ).execute(
+                    customer.insert(),
+                    [{"name": "customer %d" % i} for i in range(500)]
+                )
+            eq_(result.rowcount, 500)
+            eq_(conn.scalar(select([func.count(customer.c.id)])), 500)
+
+        assert len(committed) > 1
+        eq_(committed[-1], 500)
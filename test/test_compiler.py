@@ -0,0 +1,68 @@
+from sqlalchemy.testing import fixtures
+from sqlalchemy.testing.assertions import AssertsCompiledSQL, eq_
+from sqlalchemy import testing, select, bindparam
+from .fixtures import cust_order_item
+from sqlalchemy_foundationdb import compat
+from sqlalchemy_foundationdb.dialect.base import FDBDialect
+
+
+class LimitOffsetTest(fixtures.TablesTest, AssertsCompiledSQL):
+    __dialect__ = 'foundationdb'
+
+    run_create_tables = None
+    run_deletes = None
+
+    @classmethod
+    def define_tables(cls, metadata):
+        cust_order_item(metadata)
+        metadata.bind = None
+
+    def test_limit_offset(self):
+        customer = self.tables.customer
+        self.assert_compile(
+            select([customer.c.id]).limit(10).offset(20),
+            "SELECT customer.id FROM customer  LIMIT %(param_1)s "
+            "OFFSET %(param_2)s",
+            checkparams={"param_1": 10, "param_2": 20}
+        )
+
+    def test_offset_only(self):
+        customer = self.tables.customer
+        self.assert_compile(
+            select([customer.c.id]).offset(20),
+            "SELECT customer.id FROM customer OFFSET %(param_1)s ROWS",
+            checkparams={"param_1": 20}
+        )
+
+    def test_same_text_per_page(self):
+        customer = self.tables.customer
+        stmts = [
+            str(select([customer.c.id]).limit(10).offset(page * 10).
+                    compile(dialect=FDBDialect()))
+            for page in range(3)
+        ]
+        eq_(len(set(stmts)), 1)
+
+    @testing.skip_if(lambda: not compat.sqla_10,
+                        "literal_binds reaches LIMIT / OFFSET only "
+                        "in SQLAlchemy 1.0")
+    def test_literal_binds(self):
+        customer = self.tables.customer
+        self.assert_compile(
+            select([customer.c.id]).limit(10).offset(20),
+            "SELECT customer.id FROM customer  LIMIT 10 OFFSET 20",
+            literal_binds=True
+        )
+
+    @testing.skip_if(lambda: not compat.sqla_10,
+                        "bound LIMIT / OFFSET requires SQLAlchemy 1.0")
+    def test_limit_offset_bindparam(self):
+        customer = self.tables.customer
+        self.assert_compile(
+            select([customer.c.id]).
+                limit(bindparam('limit')).offset(bindparam('offset')),
+            "SELECT customer.id FROM customer  LIMIT %(limit)s "
+            "OFFSET %(offset)s",
+            params={"limit": 10, "offset": 20},
+            checkparams={"limit": 10, "offset": 20}
+        )
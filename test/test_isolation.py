@@ -0,0 +1,102 @@
+from sqlalchemy.testing import fixtures, engines, mock
+from sqlalchemy.testing.assertions import eq_, assert_raises, \
+            assert_raises_message
+from sqlalchemy import exc, select, func
+from .fixtures import cust_order_item
+from sqlalchemy_foundationdb.dialect.base import FDBDialect
+
+
+class TransactionCharacteristicsTest(fixtures.TestBase):
+    def _assert_statements(self, fn, statements):
+        dbapi_conn = mock.Mock()
+        fn(dbapi_conn)
+        eq_(
+            [c[1][0] for c in dbapi_conn.cursor.return_value.execute.mock_calls],
+            statements
+        )
+
+    def test_set_isolation_level(self):
+        dialect = FDBDialect()
+        self._assert_statements(
+            lambda conn: dialect.set_isolation_level(conn, 'SNAPSHOT'),
+            [
+                "SET SESSION CHARACTERISTICS AS TRANSACTION "
+                "ISOLATION LEVEL SNAPSHOT",
+                "COMMIT"
+            ]
+        )
+
+    def test_invalid_isolation_level(self):
+        assert_raises_message(
+            exc.ArgumentError,
+            "Invalid value 'READ UNCOMMITTED' for isolation_level",
+            FDBDialect().set_isolation_level, mock.Mock(), 'READ_UNCOMMITTED'
+        )
+
+    def test_set_read_only(self):
+        dialect = FDBDialect()
+        self._assert_statements(
+            lambda conn: dialect.set_read_only(conn, True),
+            [
+                "SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY",
+                "COMMIT"
+            ]
+        )
+        self._assert_statements(
+            dialect.reset_read_only,
+            [
+                "SET SESSION CHARACTERISTICS AS TRANSACTION READ WRITE",
+                "COMMIT"
+            ]
+        )
+
+
+class TransactionModeTest(fixtures.TablesTest):
+    __only_on__ = 'foundationdb'
+
+    run_deletes = 'each'
+
+    @classmethod
+    def define_tables(cls, metadata):
+        cust_order_item(metadata)
+
+    def test_isolation_level(self):
+        eng = engines.testing_engine(options={"pool_size": 1})
+        conn = eng.connect().execution_options(isolation_level='SNAPSHOT')
+        eq_(eng.dialect.get_isolation_level(conn.connection), 'SNAPSHOT')
+        conn.close()
+
+        # reset on return to the pool
+        conn = eng.connect()
+        eq_(
+            eng.dialect.get_isolation_level(conn.connection),
+            eng.dialect.default_isolation_level
+        )
+        conn.close()
+
+    def test_read_only(self):
+        customer = self.tables.customer
+        eng = engines.testing_engine(options={"pool_size": 1})
+
+        conn = eng.connect().execution_options(foundationdb_read_only=True)
+        eq_(conn.scalar(select([func.count(customer.c.id)])), 0)
+        assert_raises(
+            exc.DBAPIError,
+            conn.execute, customer.insert(), name="c1"
+        )
+        conn.close()
+
+        # reset on return to the pool
+        conn = eng.connect()
+        conn.execute(customer.insert(), name="c1")
+        conn.close()
+
+    def test_read_only_engine(self):
+        customer = self.tables.customer
+        eng = engines.testing_engine().execution_options(
+                                        foundationdb_read_only=True)
+        with eng.connect() as conn:
+            assert_raises(
+                exc.DBAPIError,
+                conn.execute, customer.insert(), name="c1"
+            )
@@ -3,7 +3,8 @@ from sqlalchemy.testing.assertions import eq_, is_, assert_raises_message
 from .fixtures import cust_order_item, cust_order_data
 from sqlalchemy import select, type_coerce, exc
 from decimal import Decimal
-from sqlalchemy_foundationdb import nested
+from sqlalchemy_foundationdb import nested, fetch_hierarchy
+from sqlalchemy_foundationdb.dialect.base import _stream_nested_rows
 from sqlalchemy.types import TypeDecorator, Integer
 
 class _Fixture(object):
@@ -25,6 +26,33 @@ class _Fixture(object):
             pass
 
 
+class StreamNestedRowsTest(fixtures.TestBase):
+    class _Result(object):
+        def __init__(self, rows):
+            self.rows = rows
+            self.closed = False
+
+        def fetchmany(self, size):
+            rows, self.rows = self.rows[:size], self.rows[size:]
+            return rows
+
+        def close(self):
+            self.closed = True
+
+    def test_exhausted(self):
+        result = self._Result([(1, ), (2, ), (3, )])
+        eq_(list(_stream_nested_rows(result, 2)), [(1, ), (2, ), (3, )])
+        is_(result.closed, True)
+
+    def test_abandoned(self):
+        result = self._Result([(1, ), (2, ), (3, )])
+        rows = _stream_nested_rows(result, 2)
+        eq_(next(rows), (1, ))
+        is_(result.closed, False)
+        rows.close()
+        is_(result.closed, True)
+
+
 class NestedTest(_Fixture, fixtures.TablesTest):
     __dialect__ = 'sqlalchemy_foundationdb'
 
@@ -45,6 +73,52 @@ class NestedTest(_Fixture, fixtures.TablesTest):
                 (103, 1, 'apple related')]
         )
 
+    def test_nested_row_streaming(self):
+        customer = self.tables.customer
+        order = self.tables.order
+
+        sub_stmt = nested(select([order]).where(order.c.customer_id
+                                            == customer.c.id)).label('o')
+        stmt = select([sub_stmt]).where(customer.c.id == 1)
+
+        r = config.db.execution_options(foundationdb_stream_nested=2).\
+                                execute(stmt)
+        row = r.fetchone()
+        sub_result = row['o']
+        assert not isinstance(sub_result, list)
+        eq_(
+            list(sub_result),
+            [(101, 1, 'apple related'), (102, 1, 'apple related'),
+                (103, 1, 'apple related')]
+        )
+        eq_(list(sub_result), [])
+
+    def test_nested_metadata_cached(self):
+        customer = self.tables.customer
+        order = self.tables.order
+        item = self.tables.item
+
+        sub_sub_stmt = nested(select([item]).where(item.c.order_id ==
+                                            order.c.id)).label('i')
+        sub_stmt = nested(select([order.c.id, sub_sub_stmt]).where(
+                            order.c.customer_id == customer.c.id)).label('o')
+        stmt = select([sub_stmt]).where(customer.c.id.in_([1, 2]))
+
+        conn = config.db.connect().execution_options(compiled_cache={})
+        try:
+            first = [row['o'] for row in conn.execute(stmt)]
+            second = [row['o'] for row in conn.execute(stmt)]
+
+            # the innermost nested result has no further nesting, so its
+            # metadata is shared across executions of the same compiled
+            # statement; the outer nested result has metadata shared within
+            # each execution.
+            eq_(len(set(id(r._metadata) for r in first)), 1)
+            is_(first[0].fetchone()['i']._metadata,
+                second[0].fetchone()['i']._metadata)
+        finally:
+            conn.close()
+
     def test_double_nested_row(self):
         customer = self.tables.customer
         order = self.tables.order
@@ -96,6 +170,67 @@ class NestedTest(_Fixture, fixtures.TablesTest):
             [('9.99_processed',), ('19.99_processed',)]
         )
 
+    def _hierarchy_stmt(self):
+        customer = self.tables.customer
+        order = self.tables.order
+        item = self.tables.item
+
+        items = nested(select([item.c.id, item.c.price]).
+                            where(item.c.order_id == order.c.id).
+                            order_by(item.c.id)).label('items')
+        orders = nested(select([order.c.id, items]).
+                            where(order.c.customer_id == customer.c.id).
+                            order_by(order.c.id)).label('orders')
+        return select([customer.c.id, orders]).\
+                    where(customer.c.id.in_([1, 10])).order_by(customer.c.id)
+
+    def test_fetch_hierarchy(self):
+        r = config.db.execute(self._hierarchy_stmt())
+        eq_(
+            fetch_hierarchy(r),
+            [
+                {"id": 1, "orders": [
+                    {"id": 101, "items": [
+                        {"id": 1001, "price": Decimal('9.99')},
+                        {"id": 1002, "price": Decimal('19.99')}]},
+                    {"id": 102, "items": [
+                        {"id": 1003, "price": Decimal('9.99')}]},
+                    {"id": 103, "items": [
+                        {"id": 1004, "price": Decimal('9.99')}]}]},
+                {"id": 10, "orders": []}
+            ]
+        )
+        assert r.closed
+
+    def test_fetch_hierarchy_named_tuples(self):
+        r = config.db.execute(self._hierarchy_stmt())
+        rows = fetch_hierarchy(r, named_tuples=True)
+        eq_(
+            [(row.id, [(o.id, [i.id for i in o.items]) for o in row.orders])
+                for row in rows],
+            [(1, [(101, [1001, 1002]), (102, [1003]), (103, [1004])]),
+                (10, [])]
+        )
+
+    def test_fetch_hierarchy_streaming(self):
+        r = config.db.execution_options(foundationdb_stream_nested=1).\
+                                execute(self._hierarchy_stmt())
+        rows = fetch_hierarchy(r)
+        eq_(
+            [len(o["items"]) for o in rows[0]["orders"]],
+            [2, 1, 1]
+        )
+
+    def test_fetch_hierarchy_no_rows(self):
+        customer = self.tables.customer
+        r = config.db.execute(customer.update().
+                        where(customer.c.id == 0).values(name='x'))
+        assert_raises_message(
+            exc.ResourceClosedError,
+            "This result object does not return rows.",
+            fetch_hierarchy, r
+        )
+
     def test_nested_text_w_option(self):
         # a statement that returns a multi-row, nested result.
         stmt = 'select customer.id, (select "order".id from "order" '\
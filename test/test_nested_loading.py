@@ -1,10 +1,15 @@
 from sqlalchemy.testing import fixtures
+from sqlalchemy.testing.util import gc_collect
 from sqlalchemy.testing.assertions import eq_, is_, AssertsCompiledSQL, \
-                AssertsExecutionResults
+                AssertsExecutionResults, assert_raises
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.orm import relationship, Session, mapper, \
-            immediateload, backref
+            immediateload, backref, configure_mappers, with_polymorphic
+from sqlalchemy import Table, Column, Integer, String, ForeignKey
+from sqlalchemy.testing import config
 from .fixtures import cust_order_item, cust_order_data
 from decimal import Decimal
+import weakref
 from sqlalchemy_foundationdb import orm
 
 class _Fixture(object):
@@ -91,6 +96,128 @@ class RenderTest(_Fixture, fixtures.MappedTest, AssertsCompiledSQL):
                 'FROM customer'
         )
 
+    def test_render_grouploaded(self):
+        Customer = self.classes.Customer
+        s = Session()
+        q = s.query(Customer).options(orm.grouploaded(Customer))
+        self.assert_compile(
+                q,
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT (SELECT item.id, '
+                'item.order_id, item.price, item.quantity FROM item '
+                'WHERE "order".id = item.order_id) AS anon_2, "order".id, '
+                '"order".customer_id, "order".order_info FROM "order" '
+                'WHERE customer.id = "order".customer_id) AS anon_1 '
+                'FROM customer'
+        )
+
+    def test_render_grouploaded_depth(self):
+        Customer = self.classes.Customer
+        s = Session()
+        q = s.query(Customer).options(orm.grouploaded(Customer, depth=1))
+        self.assert_compile(
+                q,
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT "order".id, '
+                '"order".customer_id, "order".order_info FROM "order" '
+                'WHERE customer.id = "order".customer_id) AS anon_1 '
+                'FROM customer'
+        )
+
+    def test_render_grouploaded_leaf(self):
+        Item = self.classes.Item
+        s = Session()
+        q = s.query(Item).options(orm.grouploaded(Item))
+        self.assert_compile(
+                q,
+                'SELECT item.id AS item_id, item.order_id AS item_order_id, '
+                'item.price AS item_price, item.quantity AS item_quantity '
+                'FROM item'
+        )
+
+    def test_render_load_only(self):
+        Customer = self.classes.Customer
+        s = Session()
+        q = s.query(Customer).options(
+                    orm.nestedload(Customer.orders).load_only('order_info'))
+        self.assert_compile(
+                q,
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT "order".id, '
+                '"order".order_info FROM "order" '
+                'WHERE customer.id = "order".customer_id) AS anon_1 '
+                'FROM customer'
+        )
+
+    def test_render_defer(self):
+        Customer = self.classes.Customer
+        s = Session()
+        q = s.query(Customer).options(
+                    orm.nestedload(Customer.orders).defer('order_info'))
+        self.assert_compile(
+                q,
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT "order".id, '
+                '"order".customer_id FROM "order" '
+                'WHERE customer.id = "order".customer_id) AS anon_1 '
+                'FROM customer'
+        )
+
+    def test_render_defer_primary_key(self):
+        Customer = self.classes.Customer
+        s = Session()
+        q = s.query(Customer).options(
+                    orm.nestedload(Customer.orders).defer('id'))
+        self.assert_compile(
+                q,
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT '
+                '"order".customer_id, "order".order_info, "order".id '
+                'FROM "order" WHERE customer.id = "order".customer_id) '
+                'AS anon_1 FROM customer'
+        )
+
+    def test_render_order_by_limit(self):
+        Customer, Order = self.classes.Customer, self.classes.Order
+        s = Session()
+        q = s.query(Customer).options(
+                    orm.nestedload(Customer.orders,
+                                order_by=Order.id.desc(), limit=5))
+        self.assert_compile(
+                q,
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT "order".id, '
+                '"order".customer_id, "order".order_info FROM "order" '
+                'WHERE customer.id = "order".customer_id '
+                'ORDER BY "order".id DESC  LIMIT %(param_1)s) AS anon_1 '
+                'FROM customer'
+        )
+
+    def test_render_chained_limit(self):
+        Customer, Order = self.classes.Customer, self.classes.Order
+        s = Session()
+        q = s.query(Customer).options(
+                    orm.nestedload(Customer.orders).
+                        nestedload(Order.items, limit=1))
+        self.assert_compile(
+                q,
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT (SELECT item.id, '
+                'item.order_id, item.price, item.quantity FROM item '
+                'WHERE "order".id = item.order_id  LIMIT %(param_1)s) '
+                'AS anon_2, "order".id, "order".customer_id, '
+                '"order".order_info FROM "order" '
+                'WHERE customer.id = "order".customer_id) AS anon_1 '
+                'FROM customer'
+        )
+
+    def test_all_no_order_by_limit(self):
+        Customer, Order = self.classes.Customer, self.classes.Order
+        assert_raises(
+            sa_exc.ArgumentError,
+            orm.nestedload_all, Customer.orders, Order.items, limit=1
+        )
+
     def test_subquery_no_eagers(self):
         Customer = self.classes.Customer
         s = Session()
@@ -212,6 +339,90 @@ class LoadTest(_Fixture, fixtures.MappedTest, AssertsExecutionResults):
                 [self._orm_fixture(orders=True, items=True)]
             )
 
+    def test_order_by_limit(self):
+        Customer, Order = self.classes.Customer, self.classes.Order
+
+        s = Session()
+        q = s.query(Customer).options(
+                        orm.nestedload(Customer.orders,
+                                    order_by=Order.id.desc(), limit=2)).\
+                            filter(Customer.id.in_([1, 2, 10])).\
+                            order_by(Customer.id)
+
+        with self.assert_statement_count(1):
+            eq_(
+                [(c.id, [o.id for o in c.orders]) for c in q],
+                [(1, [103, 102]), (2, [106, 105]), (10, [])]
+            )
+
+    def test_load_only(self):
+        Customer = self.classes.Customer
+
+        s = Session()
+        q = s.query(Customer).options(
+                        orm.nestedload(Customer.orders).load_only('customer_id')).\
+                            filter(Customer.id == 1)
+
+        with self.assert_statement_count(1):
+            customer = q.one()
+            orders = customer.orders
+            eq_(sorted(o.id for o in orders), [101, 102, 103])
+            for o in orders:
+                assert 'order_info' not in o.__dict__
+
+        # deferred columns load lazily, as for any other deferral
+        with self.assert_statement_count(1):
+            eq_(orders[0].order_info, 'apple related')
+
+    def test_yield_per_collection(self):
+        Customer = self.classes.Customer
+
+        s = Session()
+        q = s.query(Customer).options(orm.nestedload(Customer.orders)).\
+                            order_by(Customer.id).yield_per(2)
+
+        refs = []
+        with self.assert_statement_count(1):
+            for customer in q:
+                assert 'orders' in customer.__dict__
+                refs.append(weakref.ref(customer))
+                del customer
+                gc_collect()
+
+                # only the current batch is held by the query
+                eq_([ref() for ref in refs[:-2]], [None] * len(refs[:-2]))
+        eq_(len(refs), 11)
+
+    def test_yield_per_scalar_identity(self):
+        Order = self.classes.Order
+
+        s = Session()
+        q = s.query(Order).options(orm.nestedload(Order.customer)).\
+                            filter(Order.customer_id.in_([1, 2])).\
+                            order_by(Order.id).yield_per(2)
+
+        with self.assert_statement_count(1):
+            orders = list(q)
+        eq_([o.id for o in orders], [101, 102, 103, 104, 105, 106])
+
+        # customer 1 recurs across batches as the same object
+        is_(orders[0].__dict__['customer'], orders[2].__dict__['customer'])
+        is_(orders[3].__dict__['customer'], orders[5].__dict__['customer'])
+        eq_(orders[3].customer.name, 'Ori Herrnstadt')
+
+    def test_grouploaded(self):
+        Customer = self.classes.Customer
+
+        s = Session()
+        q = s.query(Customer).options(orm.grouploaded(Customer)).\
+                            filter(Customer.id == 1)
+
+        with self.assert_statement_count(1):
+            eq_(
+                q.all(),
+                [self._orm_fixture(orders=True, items=True)]
+            )
+
 class MappedWNestTest(_Fixture, fixtures.MappedTest, AssertsExecutionResults):
     lazy = 'nested'
     run_inserts = 'once'
@@ -241,6 +452,305 @@ class MappedWNestTest(_Fixture, fixtures.MappedTest, AssertsExecutionResults):
                 [self._orm_fixture(orders=True, items=True)]
             )
 
+class NestedloadGroupingsTest(_Fixture, fixtures.MappedTest,
+                                    AssertsExecutionResults):
+    run_inserts = 'once'
+    run_deletes = None
+
+    @classmethod
+    def setup_classes(cls):
+        # cls.Comparable is a new class for each setup step, so the
+        # classes share a base of their own
+        class Grouped(cls.Comparable):
+            pass
+        class Customer(Grouped):
+            pass
+        class Order(Grouped):
+            pass
+        class Item(Grouped):
+            pass
+        orm.nestedload_groupings(Grouped)
+
+    def test_strategies(self):
+        Customer, Order = self.classes.Customer, self.classes.Order
+        configure_mappers()
+
+        eq_(Customer.orders.property.lazy, 'nested')
+        eq_(Order.items.property.lazy, 'nested')
+
+        # many-to-one isn't configured by default
+        assert Order.customer.property.lazy != 'nested'
+
+    def test_load_group(self):
+        Customer = self.classes.Customer
+
+        s = Session()
+        q = s.query(Customer).filter(Customer.id == 1)
+
+        with self.assert_statement_count(1):
+            eq_(
+                q.all(),
+                [self._orm_fixture(orders=True, items=True)]
+            )
+
+class ManyToManyTest(fixtures.MappedTest, AssertsCompiledSQL,
+                                AssertsExecutionResults):
+    __dialect__ = 'foundationdb'
+
+    run_inserts = 'once'
+    run_deletes = None
+
+    @classmethod
+    def define_tables(cls, metadata):
+        Table('customer', metadata,
+            Column('id', Integer, primary_key=True),
+            Column('name', String(20))
+        )
+        Table('keyword', metadata,
+            Column('id', Integer, primary_key=True),
+            Column('name', String(20))
+        )
+        Table('customer_keyword', metadata,
+            Column('customer_id', Integer, ForeignKey('customer.id'),
+                                    primary_key=True),
+            Column('keyword_id', Integer, ForeignKey('keyword.id'),
+                                    primary_key=True)
+        )
+
+    @classmethod
+    def insert_data(cls):
+        customer, keyword, customer_keyword = cls.tables.customer, \
+                                    cls.tables.keyword, \
+                                    cls.tables.customer_keyword
+        config.db.execute(customer.insert(), [
+            {"id": 1, "name": 'David McFarlane'},
+            {"id": 2, "name": 'Ori Herrnstadt'},
+            {"id": 3, "name": 'Tim Wegner'},
+        ])
+        config.db.execute(keyword.insert(), [
+            {"id": 1, "name": 'vip'},
+            {"id": 2, "name": 'wholesale'},
+            {"id": 3, "name": 'overdue'},
+        ])
+        config.db.execute(customer_keyword.insert(), [
+            {"customer_id": 1, "keyword_id": 1},
+            {"customer_id": 1, "keyword_id": 2},
+            {"customer_id": 2, "keyword_id": 2},
+        ])
+
+    @classmethod
+    def setup_classes(cls):
+        class Customer(cls.Comparable):
+            pass
+        class Keyword(cls.Comparable):
+            pass
+
+    @classmethod
+    def setup_mappers(cls):
+        Customer, Keyword = cls.classes.Customer, cls.classes.Keyword
+        mapper(Customer, cls.tables.customer, properties={
+            'keywords': relationship(Keyword,
+                                secondary=cls.tables.customer_keyword,
+                                order_by=cls.tables.keyword.c.id,
+                                backref='customers')
+        })
+        mapper(Keyword, cls.tables.keyword)
+
+    def test_render(self):
+        Customer = self.classes.Customer
+        s = Session()
+        q = s.query(Customer).options(orm.nestedload(Customer.keywords))
+        self.assert_compile(
+                q,
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT keyword.id, '
+                'keyword.name FROM keyword, customer_keyword AS '
+                'customer_keyword_1 WHERE customer.id = '
+                'customer_keyword_1.customer_id '
+                'AND keyword.id = customer_keyword_1.keyword_id '
+                'ORDER BY keyword.id) AS anon_1 '
+                'FROM customer'
+        )
+
+    def test_load_collection(self):
+        Customer = self.classes.Customer
+
+        s = Session()
+        q = s.query(Customer).options(orm.nestedload(Customer.keywords)).\
+                            order_by(Customer.id)
+
+        with self.assert_statement_count(1):
+            customers = q.all()
+            eq_(
+                [(c.id, sorted(k.id for k in c.keywords))
+                    for c in customers],
+                [(1, [1, 2]), (2, [2]), (3, [])]
+            )
+
+    def test_load_backref(self):
+        Keyword = self.classes.Keyword
+
+        s = Session()
+        q = s.query(Keyword).options(orm.nestedload(Keyword.customers)).\
+                            filter(Keyword.id == 2)
+
+        with self.assert_statement_count(1):
+            keywords = q.all()
+            eq_(
+                [(k.id, sorted(c.id for c in k.customers))
+                    for k in keywords],
+                [(2, [1, 2])]
+            )
+
+class InheritanceTest(fixtures.MappedTest, AssertsCompiledSQL,
+                                AssertsExecutionResults):
+    __dialect__ = 'foundationdb'
+
+    run_inserts = 'once'
+    run_deletes = None
+
+    @classmethod
+    def define_tables(cls, metadata):
+        Table('customer', metadata,
+            Column('id', Integer, primary_key=True),
+            Column('name', String(20))
+        )
+        Table('account', metadata,
+            Column('id', Integer, primary_key=True),
+            Column('customer_id', Integer,
+                        ForeignKey('customer.id', foundationdb_grouping=True)),
+            Column('type', String(20))
+        )
+        Table('checking_account', metadata,
+            Column('id', Integer, ForeignKey('account.id'), primary_key=True),
+            Column('overdraft', Integer)
+        )
+
+    @classmethod
+    def insert_data(cls):
+        customer, account, checking_account = cls.tables.customer, \
+                                    cls.tables.account, \
+                                    cls.tables.checking_account
+        config.db.execute(customer.insert(), [
+            {"id": 1, "name": 'David McFarlane'},
+        ])
+        config.db.execute(account.insert(), [
+            {"id": 1, "customer_id": 1, "type": 'checking'},
+            {"id": 2, "customer_id": 1, "type": 'savings'},
+            {"id": 3, "customer_id": 1, "type": 'account'},
+        ])
+        config.db.execute(checking_account.insert(), [
+            {"id": 1, "overdraft": 100},
+        ])
+
+    @classmethod
+    def setup_classes(cls):
+        class Customer(cls.Comparable):
+            pass
+        class Account(cls.Comparable):
+            pass
+        class Checking(Account):
+            pass
+        class Savings(Account):
+            pass
+
+    @classmethod
+    def setup_mappers(cls):
+        Customer, Account, Checking, Savings = cls.classes.Customer, \
+                                    cls.classes.Account, \
+                                    cls.classes.Checking, \
+                                    cls.classes.Savings
+        account = cls.tables.account
+        mapper(Customer, cls.tables.customer, properties={
+            'accounts': relationship(Account, order_by=account.c.id),
+            'savings': relationship(Savings, viewonly=True)
+        })
+        mapper(Account, account, polymorphic_on=account.c.type,
+                                polymorphic_identity='account')
+        mapper(Checking, cls.tables.checking_account, inherits=Account,
+                                polymorphic_identity='checking')
+        mapper(Savings, inherits=Account, polymorphic_identity='savings')
+
+    def _with_checking(self):
+        Customer, Account, Checking = self.classes.Customer, \
+                                    self.classes.Account, \
+                                    self.classes.Checking
+        return orm.nestedload(
+                    Customer.accounts.of_type(
+                        with_polymorphic(Account, [Checking])))
+
+    def test_render_base(self):
+        Customer = self.classes.Customer
+        s = Session()
+        q = s.query(Customer).options(orm.nestedload(Customer.accounts))
+        self.assert_compile(
+                q,
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT account.id, '
+                'account.customer_id, account.type FROM account '
+                'WHERE customer.id = account.customer_id '
+                'ORDER BY account.id) AS anon_1 '
+                'FROM customer'
+        )
+
+    def test_render_joined(self):
+        Customer = self.classes.Customer
+        s = Session()
+        q = s.query(Customer).options(self._with_checking())
+        self.assert_compile(
+                q,
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT account.id AS '
+                'account_id, account.customer_id AS account_customer_id, '
+                'account.type AS account_type, checking_account.id AS '
+                'checking_account_id, checking_account.overdraft AS '
+                'checking_account_overdraft FROM account LEFT OUTER JOIN '
+                'checking_account ON account.id = checking_account.id '
+                'WHERE customer.id = account.customer_id '
+                'ORDER BY account.id) AS anon_1 '
+                'FROM customer'
+        )
+
+    def test_render_single(self):
+        Customer = self.classes.Customer
+        s = Session()
+        q = s.query(Customer).options(orm.nestedload(Customer.savings))
+        self.assert_compile(
+                q,
+                'SELECT customer.id AS customer_id, '
+                'customer.name AS customer_name, (SELECT account.id, '
+                'account.customer_id, account.type FROM account '
+                'WHERE customer.id = account.customer_id AND account.type '
+                'IN (%(type_1)s)) AS anon_1 FROM customer'
+        )
+
+    def test_load_joined(self):
+        Customer, Account, Checking, Savings = self.classes.Customer, \
+                                    self.classes.Account, \
+                                    self.classes.Checking, \
+                                    self.classes.Savings
+
+        s = Session()
+        q = s.query(Customer).options(self._with_checking())
+
+        with self.assert_statement_count(1):
+            customer = q.one()
+            eq_(
+                [(type(a), a.id) for a in customer.accounts],
+                [(Checking, 1), (Savings, 2), (Account, 3)]
+            )
+            eq_(customer.accounts[0].overdraft, 100)
+
+    def test_load_single(self):
+        Customer, Savings = self.classes.Customer, self.classes.Savings
+
+        s = Session()
+        q = s.query(Customer).options(orm.nestedload(Customer.savings))
+
+        with self.assert_statement_count(1):
+            customer = q.one()
+            eq_(customer.savings, [Savings(id=2, customer_id=1)])
+
 class RecursionOverflowTest(_Fixture, fixtures.MappedTest, AssertsExecutionResults):
     run_inserts = 'once'
     run_deletes = None
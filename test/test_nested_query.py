@@ -8,6 +8,8 @@ from .fixtures import cust_order_item, cust_order_data
 from decimal import Decimal
 from sqlalchemy_foundationdb import nested
 from sqlalchemy_foundationdb.orm import orm_nested
+from sqlalchemy_foundationdb.orm.query import _NestedInstances
+from sqlalchemy.testing import mock
 
 
 class _Fixture(object):
@@ -174,6 +176,61 @@ class LoadTest(_Fixture, fixtures.MappedTest, AssertsExecutionResults):
             )
 
 
+    def test_load_collection_entity_many_parents(self):
+        Customer = self.classes.Customer
+        Order = self.classes.Order
+
+        s = Session()
+
+        n = orm_nested(s.query(Order).filter(Customer.orders).
+                                order_by(Order.id))
+
+        q = s.query(Customer, n).filter(Customer.id.in_([1, 2, 3])).\
+                order_by(Customer.id)
+
+        setup_processors = _NestedInstances._setup_processors
+        calls = []
+        def _setup_processors(self, cursor):
+            calls.append(cursor)
+            return setup_processors(self, cursor)
+
+        with mock.patch.object(_NestedInstances, '_setup_processors',
+                                    _setup_processors):
+            with self.assert_statement_count(1):
+                result = q.all()
+
+        # the loading setup for the nested Query is done once,
+        # not once per customer
+        eq_(len(calls), 1)
+        eq_(
+            [(customer.id, [order.id for order in orders])
+                for customer, orders in result],
+            [
+                (1, [101, 102, 103]),
+                (2, [104, 105, 106]),
+                (3, [107, 108, 109])
+            ]
+        )
+
+    def test_load_collection_entity_streaming(self):
+        Customer = self.classes.Customer
+        Order = self.classes.Order
+
+        s = Session()
+
+        n = orm_nested(s.query(Order).filter(Customer.orders))
+
+        q = s.query(Customer, n).filter(Customer.id == 1).\
+                execution_options(foundationdb_stream_nested=True)
+
+        with self.assert_statement_count(1):
+            customer, orders = q.one()
+            assert not isinstance(orders, list)
+            eq_(
+                [(customer, list(orders))],
+                self._orm_fixture(orders=True)
+            )
+
     def test_load_collection_mixed(self):
         Customer = self.classes.Customer
         Order = self.classes.Order
@@ -2,7 +2,10 @@ from sqlalchemy.testing import fixtures
 from .fixtures import cust_order_item
 from sqlalchemy import select
 from sqlalchemy_foundationdb import nested
-from sqlalchemy.testing.assertions import AssertsCompiledSQL, eq_
+from sqlalchemy.testing.assertions import AssertsCompiledSQL, eq_, \
+            assert_raises_message
+from sqlalchemy import exc
+from sqlalchemy_foundationdb.dialect.base import FDBDialect
 
 class NestedSelectableTest(fixtures.TablesTest, AssertsCompiledSQL):
     __dialect__ = 'foundationdb'
@@ -32,6 +35,23 @@ class NestedSelectableTest(fixtures.TablesTest, AssertsCompiledSQL):
         stmt = select([sub_stmt]).where(customer.c.id == 1)
         self._assert_basic(stmt)
 
+    def test_no_nested_cursor_support(self):
+        customer = self.tables.customer
+        order = self.tables.order
+
+        dialect = FDBDialect()
+        dialect.supports_nested_cursors = False
+
+        stmt = select([
+                nested(select([order]).where(
+                        order.c.customer_id == customer.c.id)).label('o')
+            ])
+        assert_raises_message(
+            exc.CompileError,
+            "Nested result columns require a DBAPI connection",
+            stmt.compile, dialect=dialect
+        )
+
     def test_implicit_select_aslist(self):
         customer = self.tables.customer
         order = self.tables.order
@@ -0,0 +1,142 @@
+from sqlalchemy.testing import fixtures, engines, mock
+from sqlalchemy.testing.assertions import eq_, assert_raises
+from sqlalchemy import select, event
+from .fixtures import cust_order_item, cust_order_data
+from sqlalchemy_foundationdb.dialect.psycopg2 import _prepared_form, \
+            _PreparedStatements
+
+
+class PreparedFormTest(fixtures.TestBase):
+    def test_binds(self):
+        eq_(
+            _prepared_form(
+                "SELECT a FROM t WHERE a = %(a_1)s AND b = %(b)s "
+                "OR a = %(a_1)s AND c LIKE 'x%%'"
+            ),
+            (
+                "SELECT a FROM t WHERE a = $1 AND b = $2 "
+                "OR a = $1 AND c LIKE 'x%'",
+                ['a_1', 'b']
+            )
+        )
+
+    def test_no_binds(self):
+        eq_(_prepared_form("SELECT 5 %% 2"), ("SELECT 5 % 2", []))
+
+
+class PreparedStatementsTest(fixtures.TestBase):
+    def _context(self):
+        context = mock.Mock()
+        context.statements = statements = []
+        context.root_connection._cursor_execute.side_effect = \
+            lambda cursor, stmt, params, context: statements.append(stmt)
+        return context
+
+    def test_prepare_once(self):
+        context = self._context()
+        prepared = _PreparedStatements(5)
+
+        for i in range(3):
+            eq_(
+                prepared.execute_statement(
+                        context, "SELECT a FROM t WHERE a = %(a)s"),
+                "EXECUTE sqla_fdb_1 (%(a)s)"
+            )
+        eq_(
+            context.statements,
+            ["PREPARE sqla_fdb_1 AS SELECT a FROM t WHERE a = $1"]
+        )
+
+    def test_lru_eviction(self):
+        context = self._context()
+        prepared = _PreparedStatements(2)
+
+        prepared.execute_statement(context, "SELECT 1")
+        prepared.execute_statement(context, "SELECT 2")
+        prepared.execute_statement(context, "SELECT 1")
+        eq_(
+            prepared.execute_statement(context, "SELECT 3"),
+            "EXECUTE sqla_fdb_3"
+        )
+        eq_(
+            context.statements,
+            [
+                "PREPARE sqla_fdb_1 AS SELECT 1",
+                "PREPARE sqla_fdb_2 AS SELECT 2",
+                "PREPARE sqla_fdb_3 AS SELECT 3",
+                "DEALLOCATE sqla_fdb_2",
+            ]
+        )
+
+    def test_failed_prepare(self):
+        context = self._context()
+        prepared = _PreparedStatements(5)
+
+        cursor_execute = context.root_connection._cursor_execute
+        side_effect, cursor_execute.side_effect = \
+                cursor_execute.side_effect, Exception
+        assert_raises(Exception,
+                    prepared.execute_statement, context, "SELECT 1")
+        eq_(list(prepared.statements), [])
+
+        cursor_execute.side_effect = side_effect
+        eq_(prepared.execute_statement(context, "SELECT 1"),
+                "EXECUTE sqla_fdb_2")
+        eq_(context.statements, ["PREPARE sqla_fdb_2 AS SELECT 1"])
+
+
+class PreparedExecutionTest(fixtures.TablesTest):
+    __only_on__ = 'foundationdb'
+
+    @classmethod
+    def define_tables(cls, metadata):
+        cust_order_item(metadata)
+
+    @classmethod
+    def insert_data(cls):
+        cust_order_data(cls)
+
+    def _statements(self, eng):
+        # connect first, so that the dialect's own initialization
+        # statements aren't recorded
+        eng.connect().close()
+        statements = []
+
+        @event.listens_for(eng, "before_cursor_execute")
+        def go(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement.split(" ")[0])
+        return statements
+
+    def test_engine_wide(self):
+        customer = self.tables.customer
+        eng = engines.testing_engine(
+                    options={"prepared_statement_cache_size": 10})
+        statements = self._statements(eng)
+
+        stmt = select([customer.c.name]).where(customer.c.id == 1)
+        with eng.connect() as conn:
+            for i in range(3):
+                eq_(conn.scalar(stmt), 'David McFarlane')
+            eq_(
+                conn.scalar(stmt.params(id_1=2)),
+                'Ori Herrnstadt'
+            )
+        eq_(
+            statements,
+            ["PREPARE", "EXECUTE", "EXECUTE", "EXECUTE", "EXECUTE"]
+        )
+
+    def test_execution_option(self):
+        customer = self.tables.customer
+        eng = engines.testing_engine()
+        statements = self._statements(eng)
+
+        stmt = select([customer.c.name]).where(customer.c.id == 1)
+        with eng.connect() as conn:
+            eq_(conn.scalar(stmt), 'David McFarlane')
+            eq_(
+                conn.execution_options(foundationdb_prepared=True).
+                    scalar(stmt),
+                'David McFarlane'
+            )
+        eq_(statements, ["SELECT", "PREPARE", "EXECUTE"])
@@ -1,13 +1,19 @@
+import os
+import shutil
+import tempfile
 import sqlalchemy as sa
-from sqlalchemy.testing import fixtures
+from sqlalchemy.testing import fixtures, mock
 from sqlalchemy.schema import AddConstraint, CreateTable
 from sqlalchemy import inspect
-from sqlalchemy.testing.assertions import eq_
+from sqlalchemy.testing.assertions import eq_, AssertsExecutionResults
 from sqlalchemy.testing.exclusions import SpecPredicate
 from .fixtures import cust_order_item
 from sqlalchemy import testing
+from sqlalchemy_foundationdb.dialect.base import FDBDialect
+from sqlalchemy_foundationdb.dialect.psycopg2 import FDBPsycopg2Dialect
+from foundationdb_sql import psycopg2 as fdb_psycopg2
 
-class FDBReflectionTest(fixtures.TablesTest):
+class FDBReflectionTest(fixtures.TablesTest, AssertsExecutionResults):
     run_inserts = run_deletes = None
 
     __dialect__ = 'foundationdb'
@@ -58,6 +64,73 @@ class FDBReflectionTest(fixtures.TablesTest):
     def test_reflect_named_fk_grouping_schema(self):
         self._test_reflect_named_fk_grouping("test_schema")
 
+    def test_multi_serves_per_table(self):
+        insp = inspect(self.metadata.bind)
+
+        columns = insp.get_multi_columns()
+        pks = insp.get_multi_pk_constraint()
+        fks = insp.get_multi_foreign_keys()
+        indexes = insp.get_multi_indexes()
+
+        def go():
+            eq_(
+                [c['name'] for c in insp.get_columns("item")],
+                ['id', 'order_id', 'price', 'quantity']
+            )
+            eq_(insp.get_pk_constraint("item"), pks["item"])
+            eq_(insp.get_foreign_keys("item"), fks["item"])
+            eq_(insp.get_indexes("item"), indexes["item"])
+        self.assert_sql_count(testing.db, go, 0)
+
+        eq_(columns["customer"], insp.get_columns("customer"))
+        eq_(pks["item"]["constrained_columns"], ["id"])
+
+    def test_pk_constraints_single_query(self):
+        insp = inspect(self.metadata.bind)
+
+        # the server version is not queried for each constraint
+        self.assert_sql_count(
+            testing.db, lambda: insp.get_multi_pk_constraint(), 1)
+
+    def test_multi_foreign_keys(self):
+        insp = inspect(self.metadata.bind)
+        fks = insp.get_multi_foreign_keys()
+
+        eq_(fks.get("customer", []), [])
+        eq_(len(fks["order"]), 1)
+        eq_(fks["order"][0]['referred_table'], 'customer')
+        eq_(fks["order"][0]['referred_schema'], None)
+        eq_(fks["order"][0]['options']['foundationdb_grouping'], True)
+
+    @testing.requires.schemas
+    def test_multi_foreign_keys_schema(self):
+        insp = inspect(self.metadata.bind)
+        fks = insp.get_multi_foreign_keys("test_schema")
+
+        eq_(fks["order"][0]['referred_schema'], "test_schema")
+        eq_(
+            insp.get_foreign_keys("order", schema="test_schema"),
+            fks["order"]
+        )
+
+    def test_reflect_schema(self):
+        insp = inspect(testing.db)
+        m2 = sa.MetaData()
+        tables = insp.reflect_schema(m2, only=['customer', 'order', 'item'])
+
+        eq_(
+            set(t.name for t in tables),
+            set(['customer', 'order', 'item'])
+        )
+        order, item = m2.tables['order'], m2.tables['item']
+        eq_(
+            [fk.column for fk in item.foreign_keys],
+            [order.c.id]
+        )
+        fk = list(item.foreign_keys)[0]
+        eq_(fk.constraint.dialect_options['foundationdb']['grouping'], True)
+        eq_(list(item.primary_key), [item.c.id])
+
     def test_fk_options(self):
         """test that foreign key reflection includes options (on
         backends with {dialect}.get_foreign_keys() support)"""
@@ -86,3 +159,112 @@ class FDBReflectionTest(fixtures.TablesTest):
             ref = addresses_user_id_fkey
             for attr in test_attrs:
                 eq_(getattr(fk, attr), getattr(ref, attr))
+
+
+class ReflectionSnapshotTest(fixtures.TablesTest, AssertsExecutionResults):
+    __only_on__ = 'foundationdb'
+
+    run_inserts = run_deletes = None
+
+    @classmethod
+    def define_tables(cls, metadata):
+        cust_order_item(metadata)
+
+    def setup(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, "schema.snapshot")
+
+    def teardown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_load_snapshot(self):
+        inspect(testing.db).save_snapshot(self.path)
+
+        insp = inspect(testing.db)
+        m2 = sa.MetaData()
+
+        def go():
+            assert insp.load_snapshot(self.path)
+            insp.reflect_schema(m2, only=['customer', 'order', 'item'])
+
+        # only the fingerprint query is run
+        self.assert_sql_count(testing.db, go, 1)
+
+        item = m2.tables['item']
+        eq_(list(item.primary_key), [item.c.id])
+        eq_(
+            list(item.foreign_keys)[0].constraint.
+                dialect_options['foundationdb']['grouping'],
+            True
+        )
+        assert '_foundationdb_identity_sequence' in item.info
+
+    def test_reflect_schema_writes_snapshot(self):
+        inspect(testing.db).reflect_schema(sa.MetaData(), snapshot=self.path)
+        assert os.path.exists(self.path)
+        assert inspect(testing.db).load_snapshot(self.path)
+
+    def test_snapshot_invalidated(self):
+        inspect(testing.db).save_snapshot(self.path)
+
+        sa.Table('snapshot_t', self.metadata,
+            sa.Column('id', sa.Integer, primary_key=True)
+        ).create(testing.db)
+
+        assert not inspect(testing.db).load_snapshot(self.path)
+
+    def test_snapshot_invalidated_column_length(self):
+        def table(length):
+            return sa.Table('snapshot_len', sa.MetaData(),
+                sa.Column('id', sa.Integer, primary_key=True),
+                sa.Column('name', sa.String(length))
+            )
+
+        t = table(20)
+        t.create(testing.db)
+        try:
+            inspect(testing.db).save_snapshot(self.path)
+            t.drop(testing.db)
+            t = table(40)
+            t.create(testing.db)
+
+            assert not inspect(testing.db).load_snapshot(self.path)
+        finally:
+            t.drop(testing.db)
+
+    def test_snapshot_missing(self):
+        assert not inspect(testing.db).load_snapshot(self.path)
+
+
+class ServerCapabilitiesTest(fixtures.TestBase):
+    def test_legacy_server(self):
+        dialect = FDBDialect()
+        dialect._set_server_capabilities((1, 9, 5))
+        eq_(dialect.qualified_constraint_names, True)
+
+    def test_current_server(self):
+        dialect = FDBDialect()
+        dialect._set_server_capabilities((2, 0, 0))
+        eq_(dialect.qualified_constraint_names, False)
+
+    def test_nested_cursor_support(self):
+        dialect = FDBPsycopg2Dialect()
+        connection = mock.Mock()
+        connection.connection.connection = \
+                    mock.Mock(spec=fdb_psycopg2.Connection)
+        eq_(dialect._get_nested_cursor_support(connection), True)
+
+    def test_no_nested_cursor_support(self):
+        dialect = FDBPsycopg2Dialect()
+        connection = mock.Mock()
+        connection.connection.connection = object()
+        eq_(dialect._get_nested_cursor_support(connection), False)
+
+    @testing.only_on('foundationdb')
+    def test_initialized(self):
+        dialect = testing.db.dialect
+        eq_(
+            dialect.qualified_constraint_names,
+            dialect.server_version_info <= (1, 9, 5)
+        )
+        eq_(dialect.supports_nested_cursors, True)
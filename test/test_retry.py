@@ -0,0 +1,154 @@
+import importlib
+
+from sqlalchemy.testing import fixtures, config, mock
+from sqlalchemy.testing.assertions import eq_, assert_raises
+from sqlalchemy import exc, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, mapper
+from .fixtures import cust_order_item
+from sqlalchemy_foundationdb import retry, RetryMetrics
+from sqlalchemy_foundationdb.dialect.base import FDBDialect
+
+# the package's retry attribute is the retry class, which hides the
+# module of the same name from a dotted patch() target
+retry_module = importlib.import_module("sqlalchemy_foundationdb.retry")
+
+
+def _error(sqlstate):
+    orig = Exception("error %s" % sqlstate)
+    orig.pgcode = sqlstate
+    return exc.DBAPIError("statement", {}, orig)
+
+
+class RetryTest(fixtures.TestBase):
+    def setup(self):
+        self.engine = mock.Mock(spec=Engine, dialect=FDBDialect())
+        self.patcher = mock.patch.object(retry_module, "time")
+        self.sleep = self.patcher.start().sleep
+
+    def teardown(self):
+        self.patcher.stop()
+
+    def _unit_of_work(self, *errors):
+        errors = list(errors)
+
+        def go(conn, value):
+            if errors:
+                raise errors.pop(0)
+            return value
+        return go
+
+    def test_is_retryable(self):
+        dialect = FDBDialect()
+        assert dialect.is_retryable(_error('40002'))
+        assert not dialect.is_retryable(_error('23505'))
+        assert not dialect.is_retryable(ValueError())
+
+        dialect = FDBDialect(retryable_sqlstates=['23505'])
+        assert dialect.is_retryable(_error('23505'))
+
+    def test_retry_conflicts(self):
+        r = retry(self.engine, attempts=3)
+        go = r(self._unit_of_work(_error('40002'), _error('40004')))
+
+        eq_(go(5), 5)
+        eq_(r.metrics.attempts, 3)
+        eq_(r.metrics.conflicts, 2)
+        eq_(r.metrics.retries, 2)
+        eq_(r.metrics.failures, 0)
+        eq_(r.metrics.sqlstates, {'40002': 1, '40004': 1})
+        eq_(self.sleep.call_count, 2)
+
+        conn = self.engine.connect.return_value
+        eq_(conn.begin.return_value.rollback.call_count, 2)
+        eq_(conn.begin.return_value.commit.call_count, 1)
+        eq_(conn.close.call_count, 3)
+
+    def test_attempts_exhausted(self):
+        r = retry(self.engine, attempts=2)
+        go = r(self._unit_of_work(_error('40001'), _error('40001')))
+
+        assert_raises(exc.DBAPIError, go, 5)
+        eq_(r.metrics.attempts, 2)
+        eq_(r.metrics.failures, 1)
+
+    def test_not_retryable(self):
+        r = retry(self.engine)
+        go = r(self._unit_of_work(_error('23505')))
+
+        assert_raises(exc.DBAPIError, go, 5)
+        eq_(r.metrics.attempts, 1)
+        eq_(r.metrics.conflicts, 0)
+
+    def test_commit_conflict(self):
+        trans = self.engine.connect.return_value.begin.return_value
+        trans.commit.side_effect = [_error('40002'), None]
+
+        r = retry(self.engine)
+        attempts = 0
+        for attempt in r:
+            with attempt:
+                attempts += 1
+        eq_(attempts, 2)
+        eq_(r.metrics.conflicts, 1)
+
+    def test_shared_metrics(self):
+        metrics = RetryMetrics()
+        retry(self.engine, metrics=metrics).run(
+                    self._unit_of_work(_error('40002')), 1)
+        retry(self.engine, metrics=metrics).run(
+                    self._unit_of_work(), 1)
+        eq_(metrics.attempts, 3)
+        eq_(metrics.conflicts, 1)
+
+    def test_backoff(self):
+        r = retry(self.engine, backoff=.1, max_backoff=.3)
+        with mock.patch.object(retry_module, "random") as random:
+            for number in range(1, 5):
+                r._backoff_interval(number)
+        eq_(
+            [c[0] for c in random.uniform.call_args_list],
+            [(0, .1), (0, .2), (0, .3), (0, .3)]
+        )
+
+
+class RetryUnitOfWorkTest(fixtures.MappedTest):
+    __only_on__ = 'foundationdb'
+
+    run_deletes = 'each'
+
+    @classmethod
+    def define_tables(cls, metadata):
+        cust_order_item(metadata)
+
+    @classmethod
+    def setup_classes(cls):
+        class Customer(cls.Comparable):
+            pass
+
+    @classmethod
+    def setup_mappers(cls):
+        mapper(cls.classes.Customer, cls.tables.customer)
+
+    def test_connection(self):
+        customer = self.tables.customer
+
+        @retry(config.db)
+        def go(conn, name):
+            conn.execute(customer.insert(), name=name)
+
+        go("c1")
+        eq_(
+            config.db.execute(select([customer.c.name])).fetchall(),
+            [("c1", )]
+        )
+
+    def test_session(self):
+        Customer = self.classes.Customer
+        sess = Session(config.db)
+
+        for attempt in retry(sess):
+            with attempt as s:
+                s.add(Customer(name="c1"))
+
+        eq_(Session(config.db).query(Customer.name).all(), [("c1", )])
@@ -0,0 +1,110 @@
+from sqlalchemy.testing import fixtures, engines
+from sqlalchemy.testing.assertions import eq_
+from sqlalchemy import Table, Column, Integer, String, Sequence, select
+from sqlalchemy_foundationdb.dialect.base import _SequenceAllocator
+
+
+class _MockContext(object):
+    def __init__(self, increment, start=1):
+        self.increment = increment
+        self.next = start
+        self.statements = []
+
+    def _sequence_increment(self, schema, seq_name):
+        self.statements.append("increment")
+        return self.increment
+
+    def _execute_scalar(self, stmt, type_):
+        self.statements.append(stmt)
+        value = self.next
+        self.next += self.increment
+        return value
+
+    def _execute_rows(self, stmt, type_):
+        self.statements.append(stmt)
+        values = list(range(self.next, self.next + 3))
+        self.next += 3
+        return values
+
+
+class SequenceAllocatorTest(fixtures.TestBase):
+
+    def test_block(self):
+        allocator = _SequenceAllocator(3)
+        ctx = _MockContext(1)
+
+        eq_(
+            [allocator.next_value(ctx, ("s", "q"), "nextval('q')", None, None)
+                for i in range(5)],
+            [1, 2, 3, 4, 5]
+        )
+        eq_(
+            ctx.statements,
+            [
+                "increment",
+                "select nextval('q') from (values (1), (2), (3)) "
+                "as reserved (n)",
+                "select nextval('q') from (values (1), (2), (3)) "
+                "as reserved (n)",
+            ]
+        )
+
+    def test_hilo(self):
+        allocator = _SequenceAllocator(3)
+        ctx = _MockContext(10)
+
+        eq_(
+            [allocator.next_value(ctx, ("s", "q"), "nextval('q')", 10, None)
+                for i in range(12)],
+            list(range(1, 13))
+        )
+        eq_(
+            ctx.statements,
+            ["select nextval('q')", "select nextval('q')"]
+        )
+
+    def test_separate_sequences(self):
+        allocator = _SequenceAllocator(3)
+        ctx = _MockContext(1)
+
+        eq_(allocator.next_value(ctx, ("s", "q1"), "nextval('q1')", 1, None), 1)
+        eq_(allocator.next_value(ctx, ("s", "q2"), "nextval('q2')", 1, None), 4)
+        eq_(allocator.next_value(ctx, ("s", "q1"), "nextval('q1')", 1, None), 2)
+
+
+class SequenceBlockInsertTest(fixtures.TablesTest):
+    __only_on__ = 'foundationdb'
+
+    run_deletes = 'each'
+
+    @classmethod
+    def define_tables(cls, metadata):
+        Table('identity_t', metadata,
+            Column('id', Integer, primary_key=True),
+            Column('data', String(20))
+        )
+        Table('seq_t', metadata,
+            Column('id', Integer, Sequence('seq_t_id_seq', increment=5),
+                            primary_key=True),
+            Column('data', String(20))
+        )
+
+    def _assert_inserts(self, table):
+        eng = engines.testing_engine(options={"sequence_block_size": 4})
+        with eng.connect() as conn:
+            ids = [
+                conn.execute(table.insert(), data='d%d' % i).
+                    inserted_primary_key[0]
+                for i in range(10)
+            ]
+            eq_(len(set(ids)), 10)
+            eq_(
+                sorted(row[0] for row in conn.execute(select([table.c.id]))),
+                sorted(ids)
+            )
+
+    def test_identity_block(self):
+        self._assert_inserts(self.tables.identity_t)
+
+    def test_sequence_hilo(self):
+        self._assert_inserts(self.tables.seq_t)
@@ -0,0 +1,138 @@
+from sqlalchemy.testing import fixtures, config, engines
+from sqlalchemy.testing.assertions import eq_
+from sqlalchemy import testing, select, text
+from sqlalchemy.orm import relationship, Session, Query, mapper
+from .fixtures import cust_order_item, cust_order_data
+from sqlalchemy_foundationdb import nested, orm, compat
+from sqlalchemy_foundationdb.dialect.psycopg2 import ServerSideResultProxy, \
+            _server_side_batch_size, DEFAULT_SERVER_SIDE_BATCH_SIZE
+
+
+class BatchSizeTest(fixtures.TestBase):
+    def test_default(self):
+        eq_(_server_side_batch_size({'stream_results': True}),
+                DEFAULT_SERVER_SIDE_BATCH_SIZE)
+        eq_(_server_side_batch_size({}), DEFAULT_SERVER_SIDE_BATCH_SIZE)
+
+    def test_explicit(self):
+        eq_(_server_side_batch_size({'stream_results': 50}), 50)
+
+    def test_yield_per(self):
+        eq_(_server_side_batch_size(
+                {'stream_results': True, 'max_row_buffer': 10}), 10)
+
+    @testing.skip_if(lambda: not compat.sqla_10,
+                        "yield_per() sets max_row_buffer as of SQLAlchemy 1.0")
+    def test_query_yield_per(self):
+        q = Query([]).yield_per(10)
+        eq_(_server_side_batch_size(q._execution_options), 10)
+
+    def test_query_yield_per_stream_results(self):
+        q = Query([]).yield_per(10).execution_options(stream_results=10)
+        eq_(_server_side_batch_size(q._execution_options), 10)
+
+
+class ServerSideCursorTest(fixtures.MappedTest):
+    __only_on__ = 'foundationdb'
+
+    run_inserts = 'once'
+    run_deletes = None
+
+    @classmethod
+    def define_tables(cls, metadata):
+        cust_order_item(metadata)
+
+    @classmethod
+    def insert_data(cls):
+        cust_order_data(cls)
+
+    @classmethod
+    def setup_classes(cls):
+        class Customer(cls.Comparable):
+            pass
+        class Order(cls.Comparable):
+            pass
+
+    @classmethod
+    def setup_mappers(cls):
+        Customer, Order = cls.classes.Customer, cls.classes.Order
+        mapper(Customer, cls.tables.customer, properties={
+            'orders': relationship(Order)
+        })
+        mapper(Order, cls.tables.order)
+
+    def test_stream_results(self):
+        customer = self.tables.customer
+        with config.db.connect() as conn:
+            result = conn.execution_options(stream_results=3).execute(
+                        select([customer.c.id]).order_by(customer.c.id))
+            assert isinstance(result, ServerSideResultProxy)
+            assert result.cursor.name is not None
+            eq_([row.id for row in result], list(range(1, 12)))
+
+    def test_text(self):
+        with config.db.connect() as conn:
+            result = conn.execution_options(stream_results=True).execute(
+                        text("SELECT id FROM customer ORDER BY id"))
+            assert isinstance(result, ServerSideResultProxy)
+            eq_(result.fetchmany(2), [(1, ), (2, )])
+            eq_(len(result.fetchall()), 9)
+
+    def test_not_select(self):
+        customer = self.tables.customer
+        with config.db.connect() as conn:
+            trans = conn.begin()
+            result = conn.execution_options(stream_results=True).execute(
+                        customer.update().where(customer.c.id == 1).
+                        values(name='David McFarlane'))
+            assert not isinstance(result, ServerSideResultProxy)
+            eq_(result.rowcount, 1)
+            trans.rollback()
+
+    def test_engine_wide(self):
+        customer = self.tables.customer
+        eng = engines.testing_engine(options={"server_side_cursors": True})
+        with eng.connect() as conn:
+            result = conn.execute(select([customer.c.id]))
+            assert isinstance(result, ServerSideResultProxy)
+            eq_(len(result.fetchall()), 11)
+
+            result = conn.execution_options(stream_results=False).execute(
+                                    select([customer.c.id]))
+            assert not isinstance(result, ServerSideResultProxy)
+            result.close()
+
+    def test_nested(self):
+        customer, order = self.tables.customer, self.tables.order
+        n = nested(
+                select([order.c.id]).
+                where(order.c.customer_id == customer.c.id)
+            ).label('orders')
+        with config.db.connect() as conn:
+            result = conn.execution_options(stream_results=1).execute(
+                    select([customer.c.id, n]).
+                    where(customer.c.id.in_([1, 2])).
+                    order_by(customer.c.id))
+            assert isinstance(result, ServerSideResultProxy)
+            eq_(
+                [(row.id, sorted(r.id for r in row.orders))
+                    for row in result],
+                [(1, [101, 102, 103]), (2, [104, 105, 106])]
+            )
+
+    def test_yield_per_nestedload(self):
+        Customer = self.classes.Customer
+        sess = Session()
+
+        customers = list(
+            sess.query(Customer).
+            options(orm.nestedload(Customer.orders)).
+            filter(Customer.id.in_([1, 2])).
+            order_by(Customer.id).
+            yield_per(1)
+        )
+        eq_(
+            [(c.id, sorted(o.id for o in c.__dict__['orders']))
+                for c in customers],
+            [(1, [101, 102, 103]), (2, [104, 105, 106])]
+        )